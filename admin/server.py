@@ -1,12 +1,165 @@
 #!/usr/bin/env python3
+import argparse
+import email.utils
 import http.server
-import socketserver
+import mimetypes
 import os
+import re
+import socketserver
+import threading
+import time
+import urllib.parse
 
 PORT = 8002
 DIRECTORY = "/app/admin"
 
+# Files up to this size are kept in memory; larger ones go out with sendfile
+SMALL_FILE_LIMIT = 64 * 1024
+# How long a cached stat result is trusted before the file is checked again
+STAT_INTERVAL = 1.0
+# Filenames like app.3f9a1c2b.js are content-addressed and never change
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Precompressed siblings, best first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class LegacyAdminHandler(http.server.SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=DIRECTORY, **kwargs)
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        super().end_headers()
+
+
+class Representation:
+    """One file on disk (the original or a precompressed sibling)."""
+
+    def __init__(self, path, st):
+        self.path = path
+        self.size = st.st_size
+        self.mtime = st.st_mtime
+        self.etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        self.body = None
+        if st.st_size <= SMALL_FILE_LIMIT:
+            with open(path, "rb") as f:
+                self.body = f.read()
+
+
+class Asset:
+    def __init__(self, path, st):
+        self.path = path
+        self.key = (st.st_mtime_ns, st.st_size)
+        self.checked_at = time.monotonic()
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+        self.cache_control = IMMUTABLE if HASHED_ASSET.search(path) else "no-cache"
+        self.variants = {"identity": Representation(path, st)}
+        for encoding, suffix in ENCODINGS:
+            try:
+                sibling = os.stat(path + suffix)
+            except OSError:
+                continue
+            # A stale sibling from an older build must not shadow the file
+            if sibling.st_mtime_ns >= st.st_mtime_ns:
+                self.variants[encoding] = Representation(path + suffix, sibling)
+
+
+class AssetCache:
+    """Stat and small-file cache shared by all handler threads."""
+
+    def __init__(self):
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        asset = self._assets.get(path)
+        now = time.monotonic()
+        if asset is not None and now - asset.checked_at < STAT_INTERVAL:
+            return asset
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._assets.pop(path, None)
+            return None
+        if asset is not None and asset.key == (st.st_mtime_ns, st.st_size):
+            asset.checked_at = now
+            return asset
+        asset = Asset(path, st)
+        with self._lock:
+            self._assets[path] = asset
+        return asset
+
+
+def negotiate_encoding(header, available):
+    """Pick the best of ``available`` for an Accept-Encoding header.
+
+    Same rules as backend/compression.py, which this standalone server cannot
+    import: highest q-value wins, ties go to the ENCODINGS order, ``*`` covers
+    unlisted encodings and identity is acceptable unless refused.
+    """
+    weights = {}
+    for part in (header or "").split(","):
+        token, *params = part.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+    default = weights.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for encoding in [encoding for encoding, _ in ENCODINGS] + ["identity"]:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, 0.001 if encoding == "identity" else default)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(header, etag):
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def parse_range(header, size):
+    """Return (start, end) for a single byte range, None to ignore it, or False if unsatisfiable."""
+    match = RANGE.match(header.strip())
+    if not match or not size:
+        return None if match is None else False
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
 class AdminHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep-alive needs HTTP/1.1 and a Content-Length on every response
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; Nagle would hold the body
+    # back for a delayed ACK on every keep-alive request
+    disable_nagle_algorithm = True
+    assets = AssetCache()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=DIRECTORY, **kwargs)
 
@@ -16,8 +169,123 @@ class AdminHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
         super().end_headers()
 
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def resolve(self):
+        path = self.translate_path(urllib.parse.urlsplit(self.path).path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        return self.assets.get(path)
+
+    def send_empty(self, code, headers=()):
+        self.send_response(code)
+        for name, value in headers:
+            self.send_header(name, value)
+        # A 304 never has a body; its Content-Length would describe the full file
+        if code != 304:
+            self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def serve(self, send_body):
+        asset = self.resolve()
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding"), asset.variants)
+        variant = asset.variants[encoding]
+
+        headers = [
+            ("ETag", variant.etag),
+            ("Last-Modified", asset.last_modified),
+            ("Cache-Control", asset.cache_control),
+        ]
+        if len(asset.variants) > 1:
+            headers.append(("Vary", "Accept-Encoding"))
+
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, variant.etag)
+        else:
+            since = self.headers.get("If-Modified-Since")
+            try:
+                not_modified = since is not None and int(asset.key[0] / 1e9) <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        if not_modified:
+            self.send_empty(304, headers)
+            return
+
+        start, end = 0, variant.size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (if_range is None or if_range.strip() in (variant.etag, asset.last_modified)):
+            byte_range = parse_range(range_header, variant.size)
+            if byte_range is False:
+                self.send_empty(416, headers + [("Content-Range", f"bytes */{variant.size}")])
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+                headers.append(("Content-Range", f"bytes {start}-{end}/{variant.size}"))
+
+        self.send_response(status)
+        self.send_header("Content-Type", asset.content_type)
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1 if variant.size else 0))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if not send_body or not variant.size:
+            return
+
+        if variant.body is not None:
+            self.wfile.write(variant.body[start:end + 1])
+            return
+        self.wfile.flush()
+        with open(variant.path, "rb") as f:
+            self.connection.sendfile(f, offset=start, count=end - start + 1)
+
+
+class LegacyServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+class ThreadingServer(http.server.ThreadingHTTPServer):
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+def main():
+    global DIRECTORY
+    parser = argparse.ArgumentParser(description="Serve the admin panel's static files")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--directory", default=DIRECTORY)
+    parser.add_argument("--legacy", action="store_true", help="single-threaded SimpleHTTPRequestHandler, for comparison")
+    args = parser.parse_args()
+    DIRECTORY = os.path.abspath(args.directory)
+
+    if args.legacy:
+        os.chdir(DIRECTORY)
+        with LegacyServer(("", args.port), LegacyAdminHandler) as httpd:
+            print(f"Admin panel serving at http://localhost:{args.port} (legacy)")
+            httpd.serve_forever()
+        return
+
+    with ThreadingServer(("", args.port), AdminHandler) as httpd:
+        print(f"Admin panel serving at http://localhost:{args.port}")
+        httpd.serve_forever()
+
+
 if __name__ == "__main__":
-    os.chdir(DIRECTORY)
-    with socketserver.TCPServer(("", PORT), AdminHandler) as httpd:
-        print(f"Admin panel serving at http://localhost:{PORT}")
-        httpd.serve_forever()
\ No newline at end of file
+    main()
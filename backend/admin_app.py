@@ -1,22 +1,27 @@
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 import os
 
+from spa_shell import SpaShell
+
+# The shell has no template variables, so it is served from memory rather
+# than rendered per request
+admin_shell = SpaShell(
+    os.path.join("admin_templates", "index.html"),
+    reload=os.environ.get('ADMIN_SHELL_RELOAD', '0') == '1',
+)
+
 # Create admin app
-admin_app = FastAPI()
+admin_app = FastAPI(on_startup=[admin_shell.start], on_shutdown=[admin_shell.stop])
 
 # Mount static files for admin panel
 admin_app.mount("/static", StaticFiles(directory="admin_static"), name="static")
 
-# Templates
-templates = Jinja2Templates(directory="admin_templates")
-
 @admin_app.get("/", response_class=HTMLResponse)
 async def admin_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return admin_shell.response(request)
 
 @admin_app.get("/{path:path}", response_class=HTMLResponse)
 async def admin_catch_all(request: Request, path: str):
-    return templates.TemplateResponse("index.html", {"request": request})
\ No newline at end of file
+    return admin_shell.response(request)
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Size-bounded LRU map whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class LoadingCache(LRUCache):
+    """LRU cache that fills itself from async loaders.
+
+    Keys are tuples whose first element is a namespace, so a write can drop
+    every entry it affects with ``invalidate(namespace)``. Concurrent misses on
+    the same key share one load (single flight), and a load that started before
+    an invalidation of its key or namespace is returned to its callers but
+    never stored. Versions are kept per namespace and per in-flight key, so
+    invalidating one product does not throw away a list page being loaded.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        super().__init__(max_entries, ttl)
+        self.loads = 0
+        self.invalidations = 0
+        self._inflight = {}
+        self._namespace_versions = {}
+        self._key_versions = {}
+
+    async def get_or_load(self, key, loader):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, self._versions(key)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._load_done(key))
+        return await asyncio.shield(task)
+
+    def _versions(self, key):
+        return self._namespace_versions.get(key[0], 0), self._key_versions.get(key, 0)
+
+    async def _load(self, key, loader, versions):
+        self.loads += 1
+        value = await loader()
+        if value is not None and versions == self._versions(key):
+            self.set(key, value)
+        return value
+
+    def _load_done(self, key):
+        self._inflight.pop(key, None)
+        # Only loads still running need to see a key's invalidations
+        self._key_versions.pop(key, None)
+
+    def invalidate(self, namespace, *key):
+        """Drop ``(namespace, *key)``, or the whole namespace when no key is given."""
+        self.invalidations += 1
+        if key:
+            key = (namespace,) + key
+            if key in self._inflight:
+                self._key_versions[key] = self._key_versions.get(key, 0) + 1
+            self.delete(key)
+            return
+        self._namespace_versions[namespace] = self._namespace_versions.get(namespace, 0) + 1
+        for cached_key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[cached_key]
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "inflight": len(self._inflight),
+        })
+        return stats
+
+
+class RefreshingValue:
+    """A single computed value served stale-while-revalidate.
+
+    Once the value is older than ``ttl`` the next caller starts one background
+    refresh and still gets the previous value; only the very first caller (or
+    one after ``invalidate``) waits for the computation. Concurrent callers
+    never start duplicate refreshes.
+    """
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self.refreshes = 0
+        self._value = _MISSING
+        self._updated_at = 0.0
+        self._task = None
+
+    async def get(self):
+        if self._value is not _MISSING and time.monotonic() - self._updated_at < self.ttl:
+            return self._value
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._refresh())
+        if self._value is not _MISSING:
+            return self._value
+        return await asyncio.shield(self._task)
+
+    async def _refresh(self):
+        try:
+            self.refreshes += 1
+            value = await self.loader()
+            self._value = value
+            self._updated_at = time.monotonic()
+            return value
+        finally:
+            self._task = None
+
+    def invalidate(self):
+        self._value = _MISSING
+
+
+_MISSING = object()
@@ -0,0 +1,303 @@
+"""Synthetic capacity-testing data, bulk-loaded straight into Mongo.
+
+Everything is drawn from one seeded RNG, so the same seed and counts build the
+same database. Generated documents carry ``gen-`` ids (and @gen.example.com
+emails) so they can be removed again without touching real data.
+"""
+import asyncio
+import bisect
+import itertools
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ID_PREFIX = "gen-"
+ID_PATTERN = f"^{ID_PREFIX}"
+EMAIL_DOMAIN = "gen.example.com"
+# Every generated user signs in with this password, e.g. for load tests
+PASSWORD = "Generated@123"
+BATCH_SIZE = 5000
+# Batches being written while the next one is generated
+MAX_IN_FLIGHT = 4
+
+ORDER_STATUSES = {"pending": 8, "confirmed": 7, "shipped": 10, "delivered": 65, "cancelled": 10}
+UNITS = ["100g", "200g", "250g", "500g", "1kg", "2kg", "5kg", "200ml", "500ml", "1L", "5L", "1 pc", "6 pcs", "12 pcs"]
+DESCRIPTORS = ["Premium", "Organic", "Classic", "Fresh", "Select", "Natural", "Gold", "Homestyle", "Lite", "Value",
+               "Restaurant Grade", "Farm Fresh", "Extra Fine", "Family Pack", "Bulk"]
+# Item names per seed category; categories added later use GENERIC_NOUNS
+PRODUCT_NOUNS = {
+    "Dairy": ["Paneer", "Butter", "Cheese Slices", "Curd", "Fresh Cream", "Ghee", "Toned Milk", "Buttermilk", "Khoya"],
+    "Fruits & Vegetables": ["Tomatoes", "Onions", "Potatoes", "Spinach", "Capsicum", "Bananas", "Apples", "Coriander",
+                            "Ginger", "Garlic", "Cauliflower", "Green Peas"],
+    "Spices & Seasonings": ["Garam Masala", "Turmeric Powder", "Red Chilli Powder", "Cumin Seeds", "Coriander Powder",
+                            "Black Pepper", "Kitchen King Masala", "Chaat Masala", "Cardamom"],
+    "Frozen Foods": ["French Fries", "Green Peas", "Sweet Corn", "Veg Nuggets", "Aloo Tikki", "Spring Rolls",
+                     "Mixed Vegetables", "Paratha"],
+    "Sauces & Condiments": ["Tomato Ketchup", "Schezwan Sauce", "Soy Sauce", "Mayonnaise", "Green Chilli Sauce",
+                            "Mustard Sauce", "Pizza Sauce", "Vinegar"],
+    "Bakery Products": ["White Bread", "Brown Bread", "Burger Buns", "Pav", "Pizza Base", "Rusk", "Cookies", "Croissant"],
+    "Oils & Vinegars": ["Sunflower Oil", "Mustard Oil", "Groundnut Oil", "Olive Oil", "Rice Bran Oil", "Soybean Oil",
+                        "Apple Cider Vinegar"],
+    "Beverages": ["Tea", "Coffee", "Mango Juice", "Soda", "Lemonade", "Cold Coffee", "Tender Coconut Water"],
+    "Pulses & Grains": ["Basmati Rice", "Toor Dal", "Moong Dal", "Chana Dal", "Rajma", "Kabuli Chana", "Wheat Atta",
+                        "Poha", "Besan"],
+    "Snacks & Sweets": ["Namkeen", "Bhujia", "Potato Chips", "Gulab Jamun", "Rasgulla", "Soan Papdi", "Khakhra",
+                        "Cookies"],
+}
+GENERIC_NOUNS = ["Mix", "Blend", "Pack", "Assortment", "Essentials"]
+# Typical price range (rupees) per category, drawn log-uniformly
+PRICE_RANGES = {
+    "Dairy": (30, 900), "Fruits & Vegetables": (20, 300), "Spices & Seasonings": (25, 600),
+    "Frozen Foods": (60, 700), "Sauces & Condiments": (40, 450), "Bakery Products": (25, 250),
+    "Oils & Vinegars": (90, 2500), "Beverages": (20, 800), "Pulses & Grains": (50, 1800), "Snacks & Sweets": (10, 600),
+}
+DEFAULT_PRICE_RANGE = (20, 1000)
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ishaan", "Kabir", "Rohan", "Ananya",
+               "Diya", "Saanvi", "Aadhya", "Myra", "Kiara", "Priya", "Neha", "Pooja", "Meera", "Rahul", "Amit",
+               "Sanjay", "Sunita", "Kavita", "Imran", "Farah", "Gurpreet", "Harleen", "Joseph"]
+LAST_NAMES = ["Sharma", "Verma", "Gupta", "Joshi", "Patel", "Shah", "Mehta", "Iyer", "Nair", "Reddy", "Rao", "Singh",
+              "Kaur", "Khan", "Das", "Bose", "Chatterjee", "Mukherjee", "Pillai", "Menon", "Desai", "Kulkarni", "D'Souza"]
+CITIES = ["Mumbai", "Delhi", "Bengaluru", "Hyderabad", "Ahmedabad", "Chennai", "Kolkata", "Pune", "Jaipur", "Lucknow",
+          "Indore", "Surat", "Nagpur", "Chandigarh", "Kochi"]
+STREETS = ["MG Road", "Station Road", "Park Street", "Link Road", "Ring Road", "Market Lane", "Temple Street",
+           "Nehru Nagar", "Gandhi Chowk", "Industrial Area"]
+
+
+class Popularity:
+    """Picks indexes in range(count) with Zipf-like skew.
+
+    Rank r has weight 1 / (r + 1) ** skew; ranks are shuffled so popularity
+    is not tied to insertion order.
+    """
+
+    def __init__(self, count, skew, rng):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1.0 / (rank + 1) ** skew for rank in range(count)))
+        self.order = list(range(count))
+        rng.shuffle(self.order)
+
+    def pick(self):
+        rank = bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])
+        return self.order[min(rank, len(self.order) - 1)]
+
+    def pick_distinct(self, count):
+        count = min(count, len(self.order))
+        picked = {}
+        # Re-draws on a collision; bounded so a tiny pool cannot spin forever
+        for _ in range(count * 10):
+            index = self.pick()
+            picked[index] = None
+            if len(picked) == count:
+                break
+        return list(picked)
+
+
+class BatchWriter:
+    """insert_many in BATCH_SIZE chunks with up to MAX_IN_FLIGHT batches outstanding."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.inserted = 0
+        self._batch = []
+        self._pending = set()
+
+    async def add(self, document):
+        self._batch.append(document)
+        if len(self._batch) >= BATCH_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        self._pending.add(asyncio.ensure_future(self.collection.insert_many(batch, ordered=False)))
+        self.inserted += len(batch)
+        if len(self._pending) >= MAX_IN_FLIGHT:
+            done, self._pending = await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+
+    async def close(self):
+        await self.flush()
+        if self._pending:
+            await asyncio.gather(*self._pending)
+            self._pending = set()
+        return self.inserted
+
+
+def generated_id(rng):
+    return f"{ID_PREFIX}{uuid.UUID(int=rng.getrandbits(128), version=4)}"
+
+
+def random_date(rng, start, end):
+    return start + timedelta(seconds=rng.random() * max((end - start).total_seconds(), 0))
+
+
+async def has_generated_data(db):
+    for collection, field in ((db.products, "id"), (db.users, "id"), (db.orders, "id"), (db.cart, "user_id")):
+        if await collection.find_one({field: {"$regex": ID_PATTERN}}, {"_id": 1}):
+            return True
+    return False
+
+
+async def remove_generated(db):
+    """Delete every generated document; returns the number removed per collection."""
+    removed = {}
+    for name, field in (("cart", "user_id"), ("orders", "id"), ("users", "id"), ("products", "id")):
+        result = await db[name].delete_many({field: {"$regex": ID_PATTERN}})
+        removed[name] = result.deleted_count
+    return removed
+
+
+async def generate_products(db, rng, count, categories, brands, skew):
+    # Some categories and brands are much bigger than others, as in a real catalog
+    category_pick = Popularity(len(categories), skew, rng)
+    brand_pick = Popularity(len(brands), skew, rng)
+    writer = BatchWriter(db.products)
+    catalog = []
+    for index in range(count):
+        category = categories[category_pick.pick()]
+        brand = brands[brand_pick.pick()]
+        noun = rng.choice(PRODUCT_NOUNS.get(category, GENERIC_NOUNS))
+        unit = rng.choice(UNITS)
+        low, high = PRICE_RANGES.get(category, DEFAULT_PRICE_RANGE)
+        product = {
+            "id": generated_id(rng),
+            "sku": f"GEN-{index:08d}",
+            "name": f"{brand} {rng.choice(DESCRIPTORS)} {noun} {unit}",
+            "description": f"{noun} from {brand}, {unit} pack",
+            "price": round(low * (high / low) ** rng.random(), 2),
+            "category": category,
+            "brand": brand,
+            "image_url": f"https://images.example.com/products/{index}.jpg",
+            # About one product in twenty is out of stock
+            "stock": 0 if rng.random() < 0.05 else rng.randint(1, 1000),
+            "unit": unit,
+        }
+        catalog.append((product["id"], product["name"], product["price"]))
+        await writer.add(product)
+    await writer.close()
+    return catalog
+
+
+async def generate_users(db, rng, count, password_hash, now):
+    writer = BatchWriter(db.users)
+    users = []
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        handle = f"{first}.{last}".lower().replace("'", "")
+        user = {
+            "id": generated_id(rng),
+            "name": f"{first} {last}",
+            "email": f"{handle}.{index}@{EMAIL_DOMAIN}",
+            "password": password_hash,
+            "phone": f"9{rng.randint(0, 999999999):09d}",
+            "address": f"{rng.randint(1, 999)}, {rng.choice(STREETS)}, {rng.choice(CITIES)}",
+            "role": "user",
+            "created_at": random_date(rng, now - timedelta(days=730), now),
+        }
+        users.append((user["id"], user["created_at"], user["address"]))
+        await writer.add(user)
+    await writer.close()
+    return users
+
+
+async def generate_carts(db, rng, count, users, product_pick, catalog, now):
+    writer = BatchWriter(db.cart)
+    for user_index in rng.sample(range(len(users)), min(count, len(users))):
+        user_id = users[user_index][0]
+        for product_index in product_pick.pick_distinct(rng.randint(1, 6)):
+            await writer.add({
+                "user_id": user_id,
+                "product_id": catalog[product_index][0],
+                "quantity": rng.randint(1, 5),
+                "added_at": random_date(rng, now - timedelta(days=14), now),
+            })
+    return await writer.close()
+
+
+async def generate_orders(db, rng, count, users, user_pick, product_pick, catalog, now):
+    writer = BatchWriter(db.orders)
+    statuses, weights = list(ORDER_STATUSES), list(ORDER_STATUSES.values())
+    cumulative = list(itertools.accumulate(weights))
+    for _ in range(count):
+        user_id, created_at, address = users[user_pick.pick()]
+        items = []
+        for product_index in product_pick.pick_distinct(rng.randint(1, 6)):
+            product_id, name, price = catalog[product_index]
+            quantity = rng.randint(1, 5)
+            items.append({
+                "product_id": product_id,
+                "product_name": name,
+                "quantity": quantity,
+                "price": price,
+                "total": price * quantity,
+            })
+        status = rng.choices(statuses, cum_weights=cumulative)[0]
+        order_date = random_date(rng, created_at, now)
+        await writer.add({
+            "id": generated_id(rng),
+            "user_id": user_id,
+            "items": items,
+            "total_amount": sum(item["total"] for item in items),
+            "status": status,
+            "delivery_address": address,
+            "order_date": order_date,
+            "delivery_date": order_date + timedelta(days=rng.randint(1, 5)) if status == "delivered" else None,
+        })
+    return await writer.close()
+
+
+async def generate(db, products=0, users=0, carts=0, orders=0, seed=1, skew=1.1, password_hash=""):
+    """Insert the requested number of documents; returns counts and timings per collection.
+
+    Orders draw on the generated products and users, or on the ones already
+    in the database when none are generated. Carts are only filled for users
+    generated in this run, so real carts are never touched and --reset can
+    remove every generated row. Product counters and dashboard stats are left
+    to the caller (reconcile_stats).
+    """
+    if carts and not users:
+        raise ValueError("Carts are only generated for generated users; pass a user count too")
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    categories = sorted(await db.categories.distinct("name"))
+    brands = sorted(await db.brands.distinct("name"))
+    if not categories or not brands:
+        raise ValueError("No categories or brands to generate products for; seed the database first")
+
+    report = {}
+
+    async def timed(name, work):
+        started = time.perf_counter()
+        result = await work
+        elapsed = time.perf_counter() - started
+        inserted = len(result) if isinstance(result, list) else result
+        report[name] = {"inserted": inserted, "seconds": elapsed, "per_minute": inserted / elapsed * 60 if elapsed else 0.0}
+        return result
+
+    if products:
+        catalog = await timed("products", generate_products(db, rng, products, categories, brands, skew))
+    else:
+        catalog = [(product["id"], product["name"], product["price"])
+                   async for product in db.products.find({}, {"_id": 0, "id": 1, "name": 1, "price": 1})]
+    if users:
+        people = await timed("users", generate_users(db, rng, users, password_hash, now))
+    else:
+        people = [(user["id"], user.get("created_at") or now, user.get("address") or "")
+                  async for user in db.users.find({"role": "user"}, {"_id": 0, "id": 1, "created_at": 1, "address": 1})]
+    if orders and (not catalog or not people):
+        raise ValueError("Orders need at least one product and one user")
+    if carts and not catalog:
+        raise ValueError("Carts need at least one product")
+
+    if carts or orders:
+        product_pick = Popularity(len(catalog), skew, rng)
+        if carts:
+            await timed("cart", generate_carts(db, rng, carts, people, product_pick, catalog, now))
+        if orders:
+            # A few regular customers place most of the orders
+            user_pick = Popularity(len(people), skew, rng)
+            await timed("orders", generate_orders(db, rng, orders, people, user_pick, product_pick, catalog, now))
+    return report
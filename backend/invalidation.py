@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = uuid.uuid4().hex
+CATALOG_COLLECTIONS = ["products", "categories", "brands"]
+LOG_COLLECTION = "cache_invalidations"
+LOG_SIZE_BYTES = 1024 * 1024
+RETRY_DELAY = 1.0
+
+
+def change_to_keys(change):
+    """Map a change stream event on a catalog collection to cache keys to drop."""
+    collection = change["ns"]["coll"]
+    if collection in ("categories", "brands"):
+        return [(collection,)]
+    if collection != "products":
+        return []
+
+    operation = change["operationType"]
+    document = change.get("fullDocument")
+    if operation == "insert":
+        return [("products",)]
+    if document is None:
+        # Deleted (or gone before the update lookup): the product id is unknown
+        return [("products",), ("product",), ("product_deleted",)]
+    if operation == "update":
+        description = change.get("updateDescription", {})
+        changed = set(description.get("updatedFields", {})) | set(description.get("removedFields", []))
+        if changed <= {"stock"}:
+            # Checkout decrements only touch the detail entry; list pages ride the TTL
+            return [("product", document["id"])]
+    return [("products",), ("product", document["id"])]
+
+
+class CatalogInvalidator:
+    """Broadcasts catalog cache invalidations to every worker.
+
+    On a replica set every worker follows a change stream on the catalog
+    collections, so writes from any process (or straight to Mongo) are seen.
+    A standalone mongod has no change streams, so workers instead publish to
+    a small capped collection that every worker tails.
+    """
+
+    def __init__(self, db, apply, mode="auto"):
+        self.db = db
+        self.apply = apply
+        self.mode = mode
+        self.received = 0
+        self._task = None
+
+    async def start(self, replica_set):
+        if self.mode == "auto":
+            self.mode = "change_stream" if replica_set else "log"
+        if self.mode == "off":
+            return
+        if self.mode == "log":
+            try:
+                await self.db.create_collection(LOG_COLLECTION, capped=True, size=LOG_SIZE_BYTES)
+            except CollectionInvalid:
+                pass
+        run = self._follow_change_stream if self.mode == "change_stream" else self._tail_log
+        self._task = asyncio.create_task(run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, keys):
+        if self.mode != "log" or not keys:
+            return
+        now = datetime.utcnow()
+        await self.db[LOG_COLLECTION].insert_many([
+            {"key": list(key), "origin": WORKER_ID, "at": now} for key in keys
+        ])
+
+    def _apply(self, keys):
+        self.received += 1
+        for key in keys:
+            self.apply(*key)
+
+    async def _follow_change_stream(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": CATALOG_COLLECTIONS}}}]
+        resume_token = None
+        while True:
+            try:
+                async with self.db.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._apply(change_to_keys(change))
+            except PyMongoError as e:
+                logger.warning("Catalog change stream interrupted: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def _tail_log(self):
+        log = self.db[LOG_COLLECTION]
+        # An empty capped collection cannot be tailed, so seed it with a marker
+        latest = await log.find_one(sort=[("$natural", -1)])
+        if latest is None:
+            await log.insert_one({"key": [], "origin": WORKER_ID, "at": datetime.utcnow()})
+            latest = await log.find_one(sort=[("$natural", -1)])
+        last_id = latest["_id"]
+        while True:
+            try:
+                cursor = log.find({"_id": {"$gt": last_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for entry in cursor:
+                        last_id = entry["_id"]
+                        if entry["origin"] != WORKER_ID and entry["key"]:
+                            self._apply([tuple(entry["key"])])
+            except PyMongoError as e:
+                logger.warning("Cache invalidation log tail interrupted: %s", e)
+            await asyncio.sleep(RETRY_DELAY)
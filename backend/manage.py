@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Operational commands for the Hyperpure backend.
+
+    python manage.py ensure-indexes
+    python manage.py reconcile-stats [--dry-run]
+    python manage.py seed [--force]
+    python manage.py generate --products 100000 --users 50000 --carts 10000 --orders 1000000 [--seed 1] [--reset]
+"""
+import argparse
+import asyncio
+import time
+
+import datagen
+import server
+
+async def ensure_indexes(args):
+    created = await server.ensure_indexes()
+    for collection_name, names in created.items():
+        print(f"{collection_name}: {', '.join(names)}")
+
+async def reconcile_stats(args):
+    drift = await server.reconcile_stats(dry_run=args.dry_run)
+    if not drift:
+        print("Dashboard stats match the data, no drift")
+        return
+    for field, values in sorted(drift.items()):
+        print(f"{field}: stored {values['stored']}, actual {values['actual']}")
+    print("Dry run, stats left unchanged" if args.dry_run else f"Corrected {len(drift)} drifted counters")
+
+async def seed(args):
+    started = time.perf_counter()
+    seeded = await server.init_database(force=args.force)
+    elapsed = (time.perf_counter() - started) * 1000
+    if seeded is None:
+        print(f"Seed version {server.SEED_VERSION} already applied, nothing to do ({elapsed:.1f} ms)")
+        return
+    added = ", ".join(f"{count} {field.replace('total_', '')}" for field, count in seeded.items())
+    print(f"Applied seed version {server.SEED_VERSION}: added {added} ({elapsed:.1f} ms)")
+
+async def generate(args):
+    if args.reset:
+        removed = await datagen.remove_generated(server.db)
+        print("Removed generated data: " + ", ".join(f"{count} {name}" for name, count in removed.items()))
+    elif await datagen.has_generated_data(server.db):
+        print("Generated data already present; pass --reset to replace it")
+        return
+    # Categories, brands and the admin user come from the seed migration
+    await server.init_database()
+    password_hash = await server.password_hasher.hash(datagen.PASSWORD) if args.users else ""
+    try:
+        report = await datagen.generate(
+            server.db,
+            products=args.products,
+            users=args.users,
+            carts=args.carts,
+            orders=args.orders,
+            seed=args.seed,
+            skew=args.skew,
+            password_hash=password_hash,
+        )
+    except ValueError as e:
+        print(e)
+        return
+    for name, row in report.items():
+        print(f"{name}: {row['inserted']} documents in {row['seconds']:.1f}s ({row['per_minute']:,.0f}/min)")
+    if args.users:
+        print(f"Generated users sign in with password {datagen.PASSWORD}")
+
+    # Direct inserts bypass the write paths' $inc, so recount everything once
+    started = time.perf_counter()
+    drift = await server.reconcile_stats()
+    print(f"Reconciled {len(drift)} dashboard and product counters ({(time.perf_counter() - started) * 1000:.1f} ms)")
+    print(f"Running workers see the new catalog within CATALOG_CACHE_TTL ({server.CATALOG_CACHE_TTL:.0f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    indexes = subparsers.add_parser("ensure-indexes", help="create every index in server.INDEXES")
+    indexes.set_defaults(func=ensure_indexes)
+
+    stats = subparsers.add_parser("reconcile-stats", help="recompute dashboard counters and report drift")
+    stats.add_argument("--dry-run", action="store_true", help="report drift without correcting it")
+    stats.set_defaults(func=reconcile_stats)
+
+    seed_parser = subparsers.add_parser("seed", help="apply the sample data migration (skipped when already current)")
+    seed_parser.add_argument("--force", action="store_true", help="re-run even if the seed marker is current")
+    seed_parser.set_defaults(func=seed)
+
+    generate_parser = subparsers.add_parser("generate", help="bulk-load a seeded synthetic dataset for capacity testing")
+    generate_parser.add_argument("--products", type=int, default=0)
+    generate_parser.add_argument("--users", type=int, default=0)
+    generate_parser.add_argument("--carts", type=int, default=0, help="generated users with a non-empty cart (needs --users)")
+    generate_parser.add_argument("--orders", type=int, default=0)
+    generate_parser.add_argument("--seed", type=int, default=1)
+    generate_parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for product and customer popularity")
+    generate_parser.add_argument("--reset", action="store_true", help="remove previously generated data first")
+    generate_parser.set_defaults(func=generate)
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(args.func(args))
+    finally:
+        server.client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+
+registry = CollectorRegistry()
+
+# Buckets from 1ms to 10s; Mongo commands are usually far below a request
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route"], buckets=REQUEST_BUCKETS, registry=registry,
+)
+requests_total = Counter(
+    "http_requests_total", "Requests by route template and status code",
+    ["method", "route", "status"], registry=registry,
+)
+requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled", registry=registry,
+)
+command_latency = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+    ["collection", "command"], buckets=COMMAND_BUCKETS, registry=registry,
+)
+command_failures = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by collection and command",
+    ["collection", "command"], registry=registry,
+)
+pool_connections = Gauge(
+    "mongodb_pool_connections", "Open connections per server", ["address"], registry=registry,
+)
+pool_checked_out = Gauge(
+    "mongodb_pool_checked_out", "Connections in use per server", ["address"], registry=registry,
+)
+pool_checkout_failures = Counter(
+    "mongodb_pool_checkout_failures_total", "Failed connection checkouts by reason",
+    ["address", "reason"], registry=registry,
+)
+pool_max_size = Gauge(
+    "mongodb_pool_max_size", "Configured maxPoolSize", registry=registry,
+)
+
+
+def command_collection(command_name, command):
+    """The collection a command targets, or "" for admin/database commands."""
+    target = command.get(command_name)
+    if isinstance(target, str):
+        return target
+    if command_name == "getMore":
+        return command.get("collection", "")
+    return ""
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every command; pymongo calls this from its worker threads."""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        self._collections[(event.connection_id, event.request_id)] = command_collection(event.command_name, event.command)
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        command_latency.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        command_latency.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        command_failures.labels(collection, event.command_name).inc()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pool_connections.labels(_address(event)).set(0)
+        pool_checked_out.labels(_address(event)).set(0)
+
+    def connection_created(self, event):
+        pool_connections.labels(_address(event)).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pool_connections.labels(_address(event)).dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pool_checkout_failures.labels(_address(event), str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        pool_checked_out.labels(_address(event)).inc()
+
+    def connection_checked_in(self, event):
+        pool_checked_out.labels(_address(event)).dec()
+
+
+def _address(event):
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class MetricsMiddleware:
+    """Records latency, status and in-flight count per route template.
+
+    Labels use the matched route's path (``/api/products/{product_id}``), so
+    ids never become label values; requests that match no route share one.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_flight.dec()
+            route = scope.get("route")
+            template = route.path if route is not None else "unmatched"
+            request_latency.labels(scope["method"], template).observe(elapsed)
+            requests_total.labels(scope["method"], template, str(status)).inc()
+
+
+def render():
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+PROFILE_HEADER = "x-profile"
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_QUERY = "_profile"
+PROFILE_MODE_HEADER = "x-profile-mode"
+PROFILE_MODE_QUERY = "_profile_mode"
+MODES = ("sample", "trace")
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def frame_stack(frame):
+    stack = []
+    while frame is not None:
+        stack.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class StackSampler(threading.Thread):
+    """Samples the calling thread's Python stack every ``interval`` seconds.
+
+    Stacks are kept collapsed (``outer;inner count``), the input format of
+    flamegraph.pl and speedscope. The sampler needs the GIL to take a sample,
+    so the switch interval is lowered to match while it runs; otherwise a
+    busy event loop would only hand it over every 5ms.
+    """
+
+    unit = "samples"
+
+    def __init__(self, interval):
+        super().__init__(name="profiler", daemon=True)
+        self.target_ident = threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._switch_interval = None
+
+    def start(self):
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        super().start()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is not None:
+                self.stacks[frame_stack(frame)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def total(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class StackTracer:
+    """Deterministic profile of the calling thread via sys.setprofile.
+
+    Every call and return is seen, so requests too short to sample still get
+    a full picture, at the cost of running several times slower. Counts are
+    microseconds spent with that exact stack on top, C functions included.
+    """
+
+    unit = "us"
+
+    def __init__(self):
+        self.stacks = Counter()
+        self._current = None
+        self._last = 0
+
+    def _event(self, frame, event, arg):
+        now = time.perf_counter_ns()
+        if self._current is not None:
+            self.stacks[self._current] += now - self._last
+        if event == "call":
+            self._current = frame_stack(frame)
+        elif event == "return":
+            self._current = frame_stack(frame.f_back) or None
+        elif event == "c_call":
+            self._current = f"{frame_stack(frame)};{getattr(arg, '__qualname__', arg.__name__)} (builtin)"
+        else:
+            self._current = frame_stack(frame)
+        # Leave the bookkeeping above out of the next measurement
+        self._last = time.perf_counter_ns()
+
+    def start(self):
+        self._last = time.perf_counter_ns()
+        sys.setprofile(self._event)
+
+    def stop(self):
+        sys.setprofile(None)
+
+    def total(self):
+        return sum(self.stacks.values()) // 1000
+
+    def collapsed(self):
+        return "".join(
+            f"{stack} {ns // 1000}\n" for stack, ns in self.stacks.most_common() if ns >= 1000
+        )
+
+
+def profile_token(scope, headers):
+    """The admin token a request asks to be profiled with, or None if it doesn't.
+
+    ``X-Profile-Token`` carries a separate admin token, so customer routes can
+    be profiled with their usual auth. ``X-Profile: 1`` or ``?_profile=1``
+    profile with the request's own bearer token (admin routes). Tokens are
+    never read from the query string, where access logs would keep them.
+    """
+    token = headers.get(PROFILE_TOKEN_HEADER)
+    if token:
+        return token
+    flag = headers.get(PROFILE_HEADER)
+    if flag is None:
+        flag = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(PROFILE_QUERY, [None])[0]
+    if flag in ("1", "true"):
+        authorization = headers.get("authorization", "")
+        scheme, _, credentials = authorization.partition(" ")
+        return credentials if scheme.lower() == "bearer" and credentials else ""
+    return None
+
+
+def profile_mode(scope, headers):
+    mode = headers.get(PROFILE_MODE_HEADER)
+    if mode is None:
+        mode = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(PROFILE_MODE_QUERY, ["sample"])[0]
+    return mode if mode in MODES else None
+
+
+class ProfilerMiddleware:
+    """Profiles single /api requests on demand for admins.
+
+    ``authorize(token)`` must raise an HTTPException unless the token belongs
+    to an admin. A profiled request runs normally, but its body is replaced
+    with the collapsed stacks of the event loop thread while it ran, sampled
+    by default or traced with ``X-Profile-Mode: trace``; the original status
+    is returned in ``X-Profiled-Status``. Other requests running at the same
+    time show up in the profile too.
+    """
+
+    def __init__(self, app, authorize, interval=0.001):
+        self.app = app
+        self.authorize = authorize
+        self.interval = interval
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        token = profile_token(scope, headers)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.authorize(token)
+        except Exception as e:
+            if not hasattr(e, "status_code"):
+                raise
+            await self._respond(send, e.status_code, json.dumps({"detail": e.detail}).encode(), "application/json")
+            return
+        mode = profile_mode(scope, headers)
+        if mode is None:
+            await self._respond(send, 400, json.dumps({"detail": f"Profile mode must be one of {', '.join(MODES)}"}).encode(), "application/json")
+            return
+        if self._lock.locked():
+            await self._respond(send, 409, b'{"detail":"Another request is being profiled"}', "application/json")
+            return
+
+        async with self._lock:
+            status = 500
+            size = 0
+
+            async def discard(message):
+                nonlocal status, size
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                elif message["type"] == "http.response.body":
+                    size += len(message.get("body", b""))
+
+            profiler = StackSampler(self.interval) if mode == "sample" else StackTracer()
+            started = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        await self._respond(send, 200, profiler.collapsed().encode("utf-8"), "text/plain; charset=utf-8", [
+            ("content-disposition", f'attachment; filename="profile-{mode}.collapsed"'),
+            ("x-profiled-status", str(status)),
+            ("x-profiled-bytes", str(size)),
+            ("x-profile-mode", mode),
+            ("x-profile-unit", profiler.unit),
+            ("x-profile-total", str(profiler.total())),
+            ("x-profile-duration-ms", f"{elapsed_ms:.1f}"),
+        ])
+
+    async def _respond(self, send, status, body, content_type, headers=()):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ] + [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,24 +1,59 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict
 import os
+import json
+import asyncio
+import time
+import base64
+import hashlib
+import csv
+import io
+from collections import Counter
 from datetime import datetime, timedelta
 import jwt
-import bcrypt
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, DeleteMany, DeleteOne, IndexModel, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson import ObjectId
+from bson.errors import InvalidId
 import uuid
 from contextlib import asynccontextmanager
 
+from cache import LoadingCache, LRUCache, RefreshingValue
+from invalidation import CatalogInvalidator
+from compression import CompressionMiddleware
+import metrics
+from json_response import FastJSONResponse, StreamingJSONResponse, cursor_batches, wants_ndjson
+from passwords import HashingPoolSaturated, PasswordHasher
+from profiler import ProfilerMiddleware
+from slow_queries import LOG_COLLECTION as SLOW_COMMANDS_COLLECTION, RequestContextMiddleware, SlowCommandRecorder
+from spa_shell import SpaShell
+
 # MongoDB connection
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
-client = MongoClient(MONGO_URL)
-db = client.joshi_brothers_db
+# Motor drives the same connection pool as pymongo but yields to the event loop
+# while waiting on the server, so a slow query no longer stalls other requests.
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+# Prometheus metrics at /metrics: per-route request timings plus per-command
+# Mongo timings and pool gauges fed by pymongo's monitoring listeners
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+event_listeners = [metrics.CommandMetrics(), metrics.PoolMetrics()] if METRICS_ENABLED else []
+# Commands slower than SLOW_COMMAND_MS are recorded with their redacted shape,
+# the calling route and an explain() summary (0 turns the recorder off)
+SLOW_COMMAND_MS = float(os.environ.get('SLOW_COMMAND_MS', '100'))
+slow_commands = SlowCommandRecorder(SLOW_COMMAND_MS) if SLOW_COMMAND_MS > 0 else None
+if slow_commands is not None:
+    event_listeners.append(slow_commands)
+metrics.pool_max_size.set(MONGO_MAX_POOL_SIZE)
+client = AsyncIOMotorClient(MONGO_URL, maxPoolSize=MONGO_MAX_POOL_SIZE, event_listeners=event_listeners)
+DB_NAME = os.environ.get('DB_NAME', 'joshi_brothers_db')
+db = client[DB_NAME]
 
 # Collections
 users_collection = db.users
@@ -27,10 +62,107 @@ orders_collection = db.orders
 categories_collection = db.categories
 brands_collection = db.brands
 cart_collection = db.cart
+revoked_tokens_collection = db.revoked_tokens
+stats_collection = db.stats
+migrations_collection = db.migrations
+
+# Index registry. Every query issued by the handlers below is served by one of
+# these; ensure_indexes() applies them idempotently on startup and from
+# `python manage.py ensure-indexes`.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+    "products": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        # Only products with a SKU take part; older products have none
+        IndexModel([("sku", ASCENDING)], unique=True, name="sku_unique",
+                   partialFilterExpression={"sku": {"$type": "string"}}),
+        IndexModel([("category", ASCENDING), ("brand", ASCENDING)], name="category_brand"),
+        IndexModel([("brand", ASCENDING)], name="brand"),
+        IndexModel([("price", ASCENDING), ("_id", ASCENDING)], name="price_id"),
+        IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name_id"),
+        IndexModel([("category", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="category_price_id"),
+        IndexModel([("category", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)], name="category_name_id"),
+    ],
+    "cart": [
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)], unique=True, name="user_product_unique"),
+    ],
+    "orders": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("order_date", DESCENDING), ("_id", DESCENDING)], name="order_date_id"),
+        IndexModel([("user_id", ASCENDING), ("order_date", DESCENDING), ("_id", DESCENDING)], name="user_order_date_id"),
+        IndexModel([("status", ASCENDING), ("order_date", DESCENDING), ("_id", DESCENDING)], name="status_order_date_id"),
+    ],
+    "categories": [
+        IndexModel([("name", ASCENDING)], unique=True, name="name_unique"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+    "brands": [
+        IndexModel([("name", ASCENDING)], unique=True, name="name_unique"),
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    ],
+    "revoked_tokens": [
+        IndexModel([("digest", ASCENDING)], unique=True, name="digest_unique"),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+}
+
+# Indexes superseded by entries above, dropped by ensure_indexes() if present
+OBSOLETE_INDEXES = {
+    "orders": ["order_date", "user_order_date"],
+    # Served the dashboard's admin count, now read from the stats document
+    "users": ["role"],
+}
+
+async def ensure_indexes():
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        created[collection_name] = await db[collection_name].create_indexes(indexes)
+    for collection_name, names in OBSOLETE_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                await db[collection_name].drop_index(name)
+    return created
+
+# Catalog cache. Admin writes invalidate exactly the entries they affect; the
+# TTL bounds how long list pages can show stock that checkouts have since used.
+CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', '1024'))
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', '60'))
+catalog_cache = LoadingCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL)
+
+# Invalidations reach the other workers through a change stream, or through a
+# tailed capped collection on a standalone mongod (auto | change_stream | log | off)
+CACHE_INVALIDATION = os.environ.get('CACHE_INVALIDATION', 'auto')
+def apply_invalidation(namespace, *key):
+    # Deletes are announced under their own key, so stock and field updates
+    # leave product_ids alone; without an id every id is dropped and the ones
+    # that still exist are re-added on their next lookup
+    if namespace == "product_deleted":
+        if key:
+            product_ids.discard(key[0])
+        else:
+            product_ids.clear()
+        return
+    catalog_cache.invalidate(namespace, *key)
+
+catalog_invalidator = CatalogInvalidator(db, apply_invalidation, CACHE_INVALIDATION)
+
+async def invalidate_catalog(*keys):
+    for key in keys:
+        apply_invalidation(*key)
+    await catalog_invalidator.publish(keys)
 
 # JWT Secret
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-here')
 
+# Password hashing runs on its own pool so bcrypt never blocks the event loop
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '64'))
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
 # Models
 class UserRegister(BaseModel):
     name: str
@@ -49,6 +181,7 @@ class AdminLogin(BaseModel):
 
 class Product(BaseModel):
     id: str
+    sku: Optional[str] = None
     name: str
     description: str
     price: float
@@ -59,6 +192,7 @@ class Product(BaseModel):
     unit: str
 
 class ProductCreate(BaseModel):
+    sku: Optional[str] = None
     name: str
     description: str
     price: float
@@ -92,7 +226,16 @@ class OrderStatusUpdate(BaseModel):
     
 class CartItem(BaseModel):
     product_id: str
-    quantity: int
+    quantity: int = Field(gt=0)
+
+# Replacing a cart may set a line to 0 to remove it
+class CartBatchItem(BaseModel):
+    product_id: str
+    quantity: int = Field(ge=0)
+
+class CartBatch(BaseModel):
+    items: List[CartBatchItem]
+    replace: bool = False
 
 class Order(BaseModel):
     id: str
@@ -107,36 +250,111 @@ class Order(BaseModel):
 # Security
 security = HTTPBearer()
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+# Verified-token cache keyed by the token's SHA-256 digest. Entries never
+# outlive the token's exp claim. Revoking a token evicts it here at once and
+# from other workers' caches within TOKEN_CACHE_TTL seconds.
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '10000'))
+TOKEN_CACHE_TTL = float(os.environ.get('TOKEN_CACHE_TTL', '60'))
+token_cache = LRUCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
 
-def verify_admin_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+async def decode_token(token):
+    digest = token_digest(token)
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        if payload.get("role") != "admin":
-            raise HTTPException(status_code=403, detail="Admin access required")
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if await revoked_tokens_collection.find_one({"digest": digest}, {"_id": 1}):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    
+    ttl = TOKEN_CACHE_TTL
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(digest, payload, ttl)
+    return payload
+
+async def revoke_token(token, payload):
+    digest = token_digest(token)
+    token_cache.delete(digest)
+    expires_at = datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload else datetime.utcnow() + timedelta(days=30)
+    await revoked_tokens_collection.update_one(
+        {"digest": digest},
+        {"$set": {"digest": digest, "expires_at": expires_at}},
+        upsert=True
+    )
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await decode_token(credentials.credentials)
+
+async def verify_admin_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    payload = await decode_token(credentials.credentials)
+    if payload.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return payload
+
+async def authorize_profiling(token: str):
+    if not token:
+        raise HTTPException(status_code=401, detail="Admin token required to profile")
+    return await verify_admin_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database with sample data
-    await init_database()
+    await ensure_indexes()
+    await detect_transaction_support()
+    if await stats_need_bootstrap():
+        await reconcile_stats()
+    # Initialize database with sample data (or `python manage.py seed` before boot)
+    if SEED_ON_STARTUP:
+        await init_database()
+    await load_product_ids()
+    await catalog_invalidator.start(replica_set=TRANSACTIONS_SUPPORTED)
+    await admin_shell.start()
+    if slow_commands is not None:
+        await slow_commands.start(client, DB_NAME)
     yield
+    if slow_commands is not None:
+        await slow_commands.stop()
+    await admin_shell.stop()
+    await catalog_invalidator.stop()
+    password_hasher.shutdown()
+    client.close()
+
+# Responses. JSON_ENCODER=json switches back to the stdlib encoder; bodies of at
+# least COMPRESSION_MIN_SIZE bytes are sent with brotli or gzip when accepted
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+FastJSONResponse.encoder = JSON_ENCODER
+# Admins can profile a single /api request by sending X-Profile: 1 or ?_profile=1
+# (or an X-Profile-Token header on customer routes) and get its
+# sampled stacks back as a collapsed-stack file for flamegraph.pl or speedscope
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '1') == '1'
+PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', '1'))
 
-app = FastAPI(title="Hyperpure API", lifespan=lifespan)
+app = FastAPI(title="Hyperpure API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
+if PROFILER_ENABLED:
+    # Innermost, so the samples cover the handler and the collapsed stacks get compressed
+    app.add_middleware(ProfilerMiddleware, authorize=authorize_profiling, interval=PROFILER_INTERVAL_MS / 1000)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+)
+if slow_commands is not None:
+    app.add_middleware(RequestContextMiddleware)
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -146,191 +364,512 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if METRICS_ENABLED:
+    # Outermost, so timings include CORS preflights, compression and every other middleware
+    app.add_middleware(metrics.MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.exception_handler(HashingPoolSaturated)
+async def hashing_pool_saturated(request: Request, exc: HashingPoolSaturated):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many authentication requests, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 # Admin Panel Route
+# The shell is read and compressed once at startup; set ADMIN_SHELL_RELOAD=1
+# during development to pick up edits to index.html without a restart
+ADMIN_SHELL_RELOAD = os.environ.get('ADMIN_SHELL_RELOAD', '0') == '1'
+admin_shell = SpaShell(
+    os.path.join(os.path.dirname(__file__), "admin_templates", "index.html"),
+    reload=ADMIN_SHELL_RELOAD,
+)
+
 @app.get("/admin", response_class=HTMLResponse)
 @app.get("/admin/", response_class=HTMLResponse)
 @app.get("/admin/{path:path}", response_class=HTMLResponse)
 async def admin_panel(request: Request, path: str = ""):
-    try:
-        admin_html_path = os.path.join(os.path.dirname(__file__), "admin_templates", "index.html")
-        with open(admin_html_path, "r") as f:
-            content = f.read()
-        return HTMLResponse(content=content)
-    except Exception as e:
-        return HTMLResponse(content=f"<h1>Admin Panel Loading...</h1><p>Error: {str(e)}</p>", status_code=500)
-
-# Initialize database with sample data
-async def init_database():
-    # Create admin user if it doesn't exist
-    admin_email = "admin@joshibrothers.com"
-    if not users_collection.find_one({"email": admin_email}):
-        admin_password = bcrypt.hashpw("Admin@123".encode('utf-8'), bcrypt.gensalt())
+    return admin_shell.response(request)
+
+# Seed data. init_database() applies it as a versioned migration: upserts
+# keyed on name that only fill in missing documents, recorded in a marker so
+# later boots skip it with one read. Bump SEED_VERSION after editing the lists.
+SEED_VERSION = 1
+SEED_MARKER_ID = "seed"
+SEED_ON_STARTUP = os.environ.get('SEED_ON_STARTUP', '1') == '1'
+ADMIN_EMAIL = "admin@joshibrothers.com"
+ADMIN_PASSWORD = "Admin@123"
+
+SEED_CATEGORIES = [
+    {"name": "Dairy", "description": "Fresh dairy products", "icon": "🧈"},
+    {"name": "Fruits & Vegetables", "description": "Fresh produce", "icon": "🥦"},
+    {"name": "Spices & Seasonings", "description": "Authentic spices", "icon": "🌶️"},
+    {"name": "Frozen Foods", "description": "Frozen items", "icon": "🧊"},
+    {"name": "Sauces & Condiments", "description": "Flavor enhancers", "icon": "🍅"},
+    {"name": "Bakery Products", "description": "Fresh baked goods", "icon": "🍞"},
+    {"name": "Oils & Vinegars", "description": "Cooking oils and vinegars", "icon": "🫒"},
+    {"name": "Beverages", "description": "Drinks and beverages", "icon": "🥤"},
+    {"name": "Pulses & Grains", "description": "Lentils, rice, and grains", "icon": "🌾"},
+    {"name": "Snacks & Sweets", "description": "Ready-to-eat snacks", "icon": "🍪"},
+]
+
+SEED_BRANDS = [
+    {"name": "Ching's Secret", "logo": "https://images.unsplash.com/photo-1606787366850-de6330128bfc?w=100&h=100&fit=crop"},
+    {"name": "Everest", "logo": "https://images.unsplash.com/photo-1596040033229-a9821ebd058d?w=100&h=100&fit=crop"},
+    {"name": "Farm King", "logo": "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=100&h=100&fit=crop"},
+    {"name": "Funfoods", "logo": "https://images.unsplash.com/photo-1571091718767-18b5b1457add?w=100&h=100&fit=crop"},
+    {"name": "MDH", "logo": "https://images.unsplash.com/photo-1596040033229-a9821ebd058d?w=100&h=100&fit=crop"},
+    {"name": "Knorr", "logo": "https://images.unsplash.com/photo-1606787366850-de6330128bfc?w=100&h=100&fit=crop"},
+    {"name": "Nestlé", "logo": "https://images.unsplash.com/photo-1571091718767-18b5b1457add?w=100&h=100&fit=crop"},
+    {"name": "Amul", "logo": "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=100&h=100&fit=crop"},
+]
+
+SEED_PRODUCTS = [
+    {
+        "name": "Fresh Cream",
+        "description": "Premium quality fresh cream for cooking and baking",
+        "price": 150.0,
+        "category": "Dairy",
+        "brand": "Amul",
+        "image_url": "https://images.unsplash.com/photo-1587049352846-4a222e784d38?w=300&h=300&fit=crop",
+        "stock": 50,
+        "unit": "500ml"
+    },
+    {
+        "name": "Organic Tomatoes",
+        "description": "Fresh organic tomatoes, farm-picked",
+        "price": 80.0,
+        "category": "Fruits & Vegetables",
+        "brand": "Farm King",
+        "image_url": "https://images.unsplash.com/photo-1546470427-e15c3b6b1e2c?w=300&h=300&fit=crop",
+        "stock": 100,
+        "unit": "1kg"
+    },
+    {
+        "name": "Garam Masala",
+        "description": "Authentic garam masala spice blend",
+        "price": 85.0,
+        "category": "Spices & Seasonings",
+        "brand": "MDH",
+        "image_url": "https://images.unsplash.com/photo-1596040033229-a9821ebd058d?w=300&h=300&fit=crop",
+        "stock": 75,
+        "unit": "100g"
+    },
+    {
+        "name": "Tomato Sauce",
+        "description": "Rich tomato sauce for cooking",
+        "price": 45.0,
+        "category": "Sauces & Condiments",
+        "brand": "Knorr",
+        "image_url": "https://images.unsplash.com/photo-1606787366850-de6330128bfc?w=300&h=300&fit=crop",
+        "stock": 60,
+        "unit": "200ml"
+    },
+    {
+        "name": "Paneer",
+        "description": "Fresh cottage cheese",
+        "price": 120.0,
+        "category": "Dairy",
+        "brand": "Amul",
+        "image_url": "https://images.unsplash.com/photo-1631452180519-c014fe946bc7?w=300&h=300&fit=crop",
+        "stock": 40,
+        "unit": "200g"
+    },
+    {
+        "name": "Onions",
+        "description": "Fresh red onions",
+        "price": 60.0,
+        "category": "Fruits & Vegetables",
+        "brand": "Farm King",
+        "image_url": "https://images.unsplash.com/photo-1518977676601-b53f82aba655?w=300&h=300&fit=crop",
+        "stock": 80,
+        "unit": "1kg"
+    },
+    {
+        "name": "Basmati Rice",
+        "description": "Premium aged basmati rice",
+        "price": 200.0,
+        "category": "Pulses & Grains",
+        "brand": "Farm King",
+        "image_url": "https://images.unsplash.com/photo-1536304993881-ff6e9eefa2a6?w=300&h=300&fit=crop",
+        "stock": 30,
+        "unit": "1kg"
+    },
+    {
+        "name": "Olive Oil",
+        "description": "Extra virgin olive oil",
+        "price": 450.0,
+        "category": "Oils & Vinegars",
+        "brand": "Farm King",
+        "image_url": "https://images.unsplash.com/photo-1474979266404-7eaacbcd87c5?w=300&h=300&fit=crop",
+        "stock": 25,
+        "unit": "500ml"
+    }
+]
+
+async def seed_upserts(collection, documents):
+    operations = [
+        UpdateOne({"name": document["name"]}, {"$setOnInsert": {"id": str(uuid.uuid4()), **document}}, upsert=True)
+        for document in documents
+    ]
+    result = await collection.bulk_write(operations, ordered=False)
+    return result.upserted_count
+
+async def init_database(force=False):
+    marker = await migrations_collection.find_one({"_id": SEED_MARKER_ID})
+    if marker and marker.get("version", 0) >= SEED_VERSION and not force:
+        return None
+    
+    # Create admin user if it doesn't exist; only then is bcrypt worth paying for
+    if not await users_collection.find_one({"email": ADMIN_EMAIL}, {"_id": 1}):
         admin_user = {
             "id": str(uuid.uuid4()),
             "name": "Admin",
-            "email": admin_email,
-            "password": admin_password.decode('utf-8'),
+            "email": ADMIN_EMAIL,
+            "password": await password_hasher.hash(ADMIN_PASSWORD),
             "phone": None,
             "address": None,
             "role": "admin",
             "created_at": datetime.utcnow()
         }
-        users_collection.insert_one(admin_user)
-        print(f"Admin user created: {admin_email} / Admin@123")
-    
-    # Create sample categories
-    categories = [
-        {"id": str(uuid.uuid4()), "name": "Dairy", "description": "Fresh dairy products", "icon": "🧈"},
-        {"id": str(uuid.uuid4()), "name": "Fruits & Vegetables", "description": "Fresh produce", "icon": "🥦"},
-        {"id": str(uuid.uuid4()), "name": "Spices & Seasonings", "description": "Authentic spices", "icon": "🌶️"},
-        {"id": str(uuid.uuid4()), "name": "Frozen Foods", "description": "Frozen items", "icon": "🧊"},
-        {"id": str(uuid.uuid4()), "name": "Sauces & Condiments", "description": "Flavor enhancers", "icon": "🍅"},
-        {"id": str(uuid.uuid4()), "name": "Bakery Products", "description": "Fresh baked goods", "icon": "🍞"},
-        {"id": str(uuid.uuid4()), "name": "Oils & Vinegars", "description": "Cooking oils and vinegars", "icon": "🫒"},
-        {"id": str(uuid.uuid4()), "name": "Beverages", "description": "Drinks and beverages", "icon": "🥤"},
-        {"id": str(uuid.uuid4()), "name": "Pulses & Grains", "description": "Lentils, rice, and grains", "icon": "🌾"},
-        {"id": str(uuid.uuid4()), "name": "Snacks & Sweets", "description": "Ready-to-eat snacks", "icon": "🍪"},
-    ]
+        result = await users_collection.update_one({"email": ADMIN_EMAIL}, {"$setOnInsert": admin_user}, upsert=True)
+        if result.upserted_id is not None:
+            print(f"Admin user created: {ADMIN_EMAIL} / {ADMIN_PASSWORD}")
     
-    for category in categories:
-        if not categories_collection.find_one({"name": category["name"]}):
-            categories_collection.insert_one(category)
-    
-    # Create sample brands
-    brands = [
-        {"id": str(uuid.uuid4()), "name": "Ching's Secret", "logo": "https://images.unsplash.com/photo-1606787366850-de6330128bfc?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "Everest", "logo": "https://images.unsplash.com/photo-1596040033229-a9821ebd058d?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "Farm King", "logo": "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "Funfoods", "logo": "https://images.unsplash.com/photo-1571091718767-18b5b1457add?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "MDH", "logo": "https://images.unsplash.com/photo-1596040033229-a9821ebd058d?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "Knorr", "logo": "https://images.unsplash.com/photo-1606787366850-de6330128bfc?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "Nestlé", "logo": "https://images.unsplash.com/photo-1571091718767-18b5b1457add?w=100&h=100&fit=crop"},
-        {"id": str(uuid.uuid4()), "name": "Amul", "logo": "https://images.unsplash.com/photo-1560472354-b33ff0c44a43?w=100&h=100&fit=crop"},
-    ]
+    total_categories, total_brands, total_products = await asyncio.gather(
+        seed_upserts(categories_collection, SEED_CATEGORIES),
+        seed_upserts(brands_collection, SEED_BRANDS),
+        seed_upserts(products_collection, SEED_PRODUCTS),
+    )
+    seeded = {"total_categories": total_categories, "total_brands": total_brands, "total_products": total_products}
+    await bump_stats({field: count for field, count in seeded.items() if count})
+    # New categories/brands may be used by products that already existed, so
+    # count rather than increment
+    if any(seeded.values()):
+        await reconcile_product_counts(categories_collection, "category")
+        await reconcile_product_counts(brands_collection, "brand")
     
-    for brand in brands:
-        if not brands_collection.find_one({"name": brand["name"]}):
-            brands_collection.insert_one(brand)
+    await migrations_collection.update_one(
+        {"_id": SEED_MARKER_ID},
+        {"$set": {"version": SEED_VERSION, "applied_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return seeded
 
-    # Create sample products
-    sample_products = [
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Fresh Cream",
-            "description": "Premium quality fresh cream for cooking and baking",
-            "price": 150.0,
-            "category": "Dairy",
-            "brand": "Amul",
-            "image_url": "https://images.unsplash.com/photo-1587049352846-4a222e784d38?w=300&h=300&fit=crop",
-            "stock": 50,
-            "unit": "500ml"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Organic Tomatoes",
-            "description": "Fresh organic tomatoes, farm-picked",
-            "price": 80.0,
-            "category": "Fruits & Vegetables",
-            "brand": "Farm King",
-            "image_url": "https://images.unsplash.com/photo-1546470427-e15c3b6b1e2c?w=300&h=300&fit=crop",
-            "stock": 100,
-            "unit": "1kg"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Garam Masala",
-            "description": "Authentic garam masala spice blend",
-            "price": 85.0,
-            "category": "Spices & Seasonings",
-            "brand": "MDH",
-            "image_url": "https://images.unsplash.com/photo-1596040033229-a9821ebd058d?w=300&h=300&fit=crop",
-            "stock": 75,
-            "unit": "100g"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Tomato Sauce",
-            "description": "Rich tomato sauce for cooking",
-            "price": 45.0,
-            "category": "Sauces & Condiments",
-            "brand": "Knorr",
-            "image_url": "https://images.unsplash.com/photo-1606787366850-de6330128bfc?w=300&h=300&fit=crop",
-            "stock": 60,
-            "unit": "200ml"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Paneer",
-            "description": "Fresh cottage cheese",
-            "price": 120.0,
-            "category": "Dairy",
-            "brand": "Amul",
-            "image_url": "https://images.unsplash.com/photo-1631452180519-c014fe946bc7?w=300&h=300&fit=crop",
-            "stock": 40,
-            "unit": "200g"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Onions",
-            "description": "Fresh red onions",
-            "price": 60.0,
-            "category": "Fruits & Vegetables",
-            "brand": "Farm King",
-            "image_url": "https://images.unsplash.com/photo-1518977676601-b53f82aba655?w=300&h=300&fit=crop",
-            "stock": 80,
-            "unit": "1kg"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": "Basmati Rice",
-            "description": "Premium aged basmati rice",
-            "price": 200.0,
-            "category": "Pulses & Grains",
-            "brand": "Farm King",
-            "image_url": "https://images.unsplash.com/photo-1536304993881-ff6e9eefa2a6?w=300&h=300&fit=crop",
-            "stock": 30,
-            "unit": "1kg"
-        },
-        {
+# Dashboard counters, kept current by the write paths with $inc so the
+# dashboard is a single document read. reconcile_stats() recomputes them from
+# scratch (on first boot and via `python manage.py reconcile-stats`).
+STATS_ID = "dashboard"
+STATS_COUNTERS = ["total_products", "total_categories", "total_brands", "total_users", "total_orders", "revenue_total"]
+STATS_BREAKDOWNS = ["orders_by_status", "revenue_by_status"]
+
+async def bump_stats(increments):
+    if increments:
+        await stats_collection.update_one({"_id": STATS_ID}, {"$inc": increments}, upsert=True)
+
+# Each category and brand document carries the number of products that use it,
+# so delete guards are one indexed read and renames know what they cascade to
+async def bump_product_counts(category, brand, sign=1):
+    await asyncio.gather(
+        categories_collection.update_one({"name": category}, {"$inc": {"product_count": sign}}),
+        brands_collection.update_one({"name": brand}, {"$inc": {"product_count": sign}}),
+    )
+
+async def compute_product_counts(field):
+    groups = await products_collection.aggregate([
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    return {entry["_id"]: entry["count"] for entry in groups}
+
+async def reconcile_product_counts(collection, field, dry_run=False):
+    actual = await compute_product_counts(field)
+    drift = {}
+    fixes = []
+    async for document in collection.find({}, {"_id": 0, "name": 1, "product_count": 1}):
+        stored = document.get("product_count")
+        count = actual.get(document["name"], 0)
+        if stored != count:
+            drift[f"{collection.name}.{document['name']}.product_count"] = {"stored": stored, "actual": count}
+            fixes.append(UpdateOne({"name": document["name"]}, {"$set": {"product_count": count}}))
+    if fixes and not dry_run:
+        await collection.bulk_write(fixes, ordered=False)
+    return drift
+
+async def stats_need_bootstrap():
+    if not await stats_collection.find_one({"_id": STATS_ID}, {"_id": 1}):
+        return True
+    missing = {"product_count": {"$exists": False}}
+    return bool(await categories_collection.find_one(missing, {"_id": 1}) or await brands_collection.find_one(missing, {"_id": 1}))
+
+def order_stats_increments(order_status, amount, sign=1):
+    return {
+        f"orders_by_status.{order_status}": sign,
+        f"revenue_by_status.{order_status}": sign * amount,
+    }
+
+async def compute_stats():
+    by_status, total_products, total_categories, total_brands, total_users = await asyncio.gather(
+        orders_collection.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}, "revenue": {"$sum": "$total_amount"}}}
+        ]).to_list(length=None),
+        products_collection.count_documents({}),
+        categories_collection.count_documents({}),
+        brands_collection.count_documents({}),
+        users_collection.count_documents({"role": {"$ne": "admin"}}),
+    )
+    return {
+        "total_products": total_products,
+        "total_categories": total_categories,
+        "total_brands": total_brands,
+        "total_users": total_users,
+        "total_orders": sum(entry["count"] for entry in by_status),
+        "revenue_total": sum(entry["revenue"] for entry in by_status),
+        "orders_by_status": {entry["_id"]: entry["count"] for entry in by_status},
+        "revenue_by_status": {entry["_id"]: entry["revenue"] for entry in by_status},
+    }
+
+def stats_differ(stored, actual):
+    if isinstance(stored, float) or isinstance(actual, float):
+        return abs(stored - actual) > 0.005
+    return stored != actual
+
+async def reconcile_stats(dry_run=False):
+    # Writes that land between the recompute and the replace are lost from the
+    # counters; run again (or rely on the next run) if drift keeps showing up
+    actual = await compute_stats()
+    stored = await stats_collection.find_one({"_id": STATS_ID}) or {}
+    
+    drift = {}
+    for field in STATS_COUNTERS:
+        if stats_differ(stored.get(field, 0), actual[field]):
+            drift[field] = {"stored": stored.get(field, 0), "actual": actual[field]}
+    for field in STATS_BREAKDOWNS:
+        stored_values = stored.get(field, {})
+        for key in set(stored_values) | set(actual[field]):
+            if stats_differ(stored_values.get(key, 0), actual[field].get(key, 0)):
+                drift[f"{field}.{key}"] = {"stored": stored_values.get(key, 0), "actual": actual[field].get(key, 0)}
+    
+    if not dry_run:
+        await stats_collection.replace_one({"_id": STATS_ID}, {"_id": STATS_ID, **actual}, upsert=True)
+    drift.update(await reconcile_product_counts(categories_collection, "category", dry_run))
+    drift.update(await reconcile_product_counts(brands_collection, "brand", dry_run))
+    return drift
+
+# Catalog paging. Cursors are opaque tokens holding the last row's sort key
+# and _id, so each page is an index range scan rather than a skip.
+MAX_PAGE_SIZE = 500
+# Unpaged list requests are streamed from the cursor in batches of this size
+# (as NDJSON when the client sends Accept: application/x-ndjson)
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '500'))
+PRODUCT_SORTS = {
+    "price": ("price", ASCENDING),
+    "-price": ("price", DESCENDING),
+    "name": ("name", ASCENDING),
+    "-name": ("name", DESCENDING),
+    "newest": ("_id", DESCENDING),
+}
+
+def encode_cursor(value, object_id):
+    payload = json.dumps([value, str(object_id)]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        value, object_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return value, ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(sort_field, direction, position):
+    value, object_id = position
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if sort_field == "_id":
+        return {"_id": {op: object_id}}
+    return {"$or": [{sort_field: {op: value}}, {sort_field: value, "_id": {op: object_id}}]}
+
+# Fetch several products with one $in query, keyed by product id
+async def find_products_by_id(product_ids, session=None):
+    if not product_ids:
+        return {}
+    cursor = products_collection.find({"id": {"$in": list(set(product_ids))}}, {"_id": 0}, session=session)
+    return {product["id"]: product async for product in cursor}
+
+# Known product ids, so cart writes can skip the existence lookup. Misses still
+# fall through to Mongo in case another worker created the product.
+product_ids = set()
+
+async def load_product_ids():
+    product_ids.clear()
+    async for product in products_collection.find({}, {"_id": 0, "id": 1}):
+        product_ids.add(product["id"])
+
+async def find_missing_products(ids):
+    unknown = [product_id for product_id in ids if product_id not in product_ids]
+    if unknown:
+        async for product in products_collection.find({"id": {"$in": unknown}}, {"_id": 0, "id": 1}):
+            product_ids.add(product["id"])
+    return [product_id for product_id in unknown if product_id not in product_ids]
+
+async def product_exists(product_id):
+    return not await find_missing_products([product_id])
+
+# Checkout engine
+# Transactions need a replica set or sharded cluster; against a standalone
+# mongod checkout falls back to per-line conditional updates with compensation.
+TRANSACTIONS_SUPPORTED = False
+
+async def detect_transaction_support():
+    global TRANSACTIONS_SUPPORTED
+    hello = await client.admin.command("hello")
+    TRANSACTIONS_SUPPORTED = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return TRANSACTIONS_SUPPORTED
+
+def insufficient_stock(names):
+    return HTTPException(status_code=400, detail=f"Insufficient stock for: {', '.join(names)}")
+
+async def reserve_stock(lines, session=None):
+    if not lines:
+        return
+    if session is not None:
+        # Inside a transaction: one conditional bulk write, abort if any line is short
+        short = [product["name"] for item, product in lines if product["stock"] < item["quantity"]]
+        if short:
+            raise insufficient_stock(short)
+        result = await products_collection.bulk_write([
+            UpdateOne({"id": product["id"], "stock": {"$gte": item["quantity"]}}, {"$inc": {"stock": -item["quantity"]}})
+            for item, product in lines
+        ], ordered=False, session=session)
+        if result.matched_count != len(lines):
+            # Lines that matched were decremented; the ones left at their read stock failed
+            current = await find_products_by_id([product["id"] for item, product in lines], session=session)
+            raise insufficient_stock([
+                product["name"] for item, product in lines
+                if product["id"] not in current or current[product["id"]]["stock"] == product["stock"]
+            ])
+        return
+    
+    reserved = []
+    for item, product in lines:
+        result = await products_collection.update_one(
+            {"id": product["id"], "stock": {"$gte": item["quantity"]}},
+            {"$inc": {"stock": -item["quantity"]}}
+        )
+        if result.matched_count == 0:
+            await release_stock(reserved)
+            raise insufficient_stock([product["name"]])
+        reserved.append((item, product))
+
+async def release_stock(lines):
+    # Compensation for standalone checkouts: give back what reserve_stock took
+    if not lines:
+        return
+    await products_collection.bulk_write([
+        UpdateOne({"id": product["id"]}, {"$inc": {"stock": item["quantity"]}})
+        for item, product in lines
+    ], ordered=False)
+
+async def checkout(user_id, delivery_address, session=None):
+    # Get cart items
+    cart_items = await cart_collection.find({"user_id": user_id}, session=session).to_list(length=None)
+    if not cart_items:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    # Rows written before quantities were validated must not raise stock or revenue
+    invalid = [item["product_id"] for item in cart_items if item["quantity"] <= 0]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid quantity for: {', '.join(invalid)}")
+    
+    products = await find_products_by_id([item["product_id"] for item in cart_items], session=session)
+    lines = [(item, products[item["product_id"]]) for item in cart_items if item["product_id"] in products]
+    await reserve_stock(lines, session=session)
+    
+    order = None
+    try:
+        # Calculate total
+        total_amount = 0
+        order_items = []
+        
+        for item, product in lines:
+            item_total = product["price"] * item["quantity"]
+            total_amount += item_total
+            order_items.append({
+                "product_id": item["product_id"],
+                "product_name": product["name"],
+                "quantity": item["quantity"],
+                "price": product["price"],
+                "total": item_total
+            })
+        
+        # Create order
+        order = {
             "id": str(uuid.uuid4()),
-            "name": "Olive Oil",
-            "description": "Extra virgin olive oil",
-            "price": 450.0,
-            "category": "Oils & Vinegars",
-            "brand": "Farm King",
-            "image_url": "https://images.unsplash.com/photo-1474979266404-7eaacbcd87c5?w=300&h=300&fit=crop",
-            "stock": 25,
-            "unit": "500ml"
+            "user_id": user_id,
+            "items": order_items,
+            "total_amount": total_amount,
+            "status": "pending",
+            "delivery_address": delivery_address,
+            "order_date": datetime.utcnow(),
+            "delivery_date": None
         }
-    ]
+        
+        await orders_collection.insert_one(order, session=session)
+        
+        # Clear cart
+        await cart_collection.delete_many({"user_id": user_id}, session=session)
+    except Exception:
+        # A transaction's abort undoes every write; without one the order and
+        # the reserved stock have to be taken back by hand
+        if session is None:
+            if order is not None:
+                await orders_collection.delete_one({"id": order["id"]})
+            await release_stock(lines)
+        raise
     
-    for product in sample_products:
-        if not products_collection.find_one({"name": product["name"]}):
-            products_collection.insert_one(product)
+    return order
+
+async def place_order(user_id, delivery_address):
+    if not TRANSACTIONS_SUPPORTED:
+        return await checkout(user_id, delivery_address)
+    async with await client.start_session() as session:
+        # with_transaction retries the whole checkout on write conflicts
+        return await session.with_transaction(
+            lambda session: checkout(user_id, delivery_address, session=session)
+        )
 
 # Auth endpoints
 @app.post("/api/auth/register")
 async def register(user: UserRegister):
     # Check if user already exists
-    if users_collection.find_one({"email": user.email}):
+    if await users_collection.find_one({"email": user.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), bcrypt.gensalt())
+    hashed_password = await password_hasher.hash(user.password)
     
     # Create user
     user_data = {
         "id": str(uuid.uuid4()),
         "name": user.name,
         "email": user.email,
-        "password": hashed_password.decode('utf-8'),
+        "password": hashed_password,
         "phone": user.phone,
         "address": user.address,
         "role": "user",
         "created_at": datetime.utcnow()
     }
     
-    users_collection.insert_one(user_data)
+    # The find above is only a fast path; the unique index settles concurrent signups
+    try:
+        await users_collection.insert_one(user_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await bump_stats({"total_users": 1})
     
     # Generate token
     token = jwt.encode({
@@ -345,12 +884,12 @@ async def register(user: UserRegister):
 @app.post("/api/auth/login")
 async def login(user: UserLogin):
     # Find user
-    db_user = users_collection.find_one({"email": user.email})
+    db_user = await users_collection.find_one({"email": user.email})
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Verify password
-    if not bcrypt.checkpw(user.password.encode('utf-8'), db_user["password"].encode('utf-8')):
+    if not await password_hasher.verify(user.password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Generate token
@@ -363,33 +902,119 @@ async def login(user: UserLogin):
     
     return {"token": token, "user": {"id": db_user["id"], "name": db_user["name"], "email": db_user["email"]}}
 
+@app.post("/api/auth/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    payload = await decode_token(credentials.credentials)
+    await revoke_token(credentials.credentials, payload)
+    return {"message": "Logged out successfully"}
+
 # Product endpoints
 @app.get("/api/products")
-async def get_products(category: Optional[str] = None, brand: Optional[str] = None):
+async def get_products(
+    request: Request,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    # NDJSON is the export path: stream straight from the cursor, uncached
+    if wants_ndjson(request):
+        query, sort_field, requested = products_query(category, brand, min_price, max_price, sort, cursor, fields)
+        if limit:
+            query = query.limit(limit)
+        return StreamingJSONResponse(stream_products(query, sort_field, requested), "products", ndjson=True)
+    key = ("products", category, brand, min_price, max_price, sort, limit, cursor, fields)
+    return FastJSONResponse(await catalog_cache.get_or_load(
+        key, lambda: load_products(category, brand, min_price, max_price, sort, limit, cursor, fields)
+    ))
+
+def products_query(category, brand, min_price, max_price, sort, cursor, fields):
     filter_criteria = {}
     if category:
         filter_criteria["category"] = category
     if brand:
         filter_criteria["brand"] = brand
+    if min_price is not None or max_price is not None:
+        filter_criteria["price"] = {}
+        if min_price is not None:
+            filter_criteria["price"]["$gte"] = min_price
+        if max_price is not None:
+            filter_criteria["price"]["$lte"] = max_price
+    
+    if sort is not None and sort not in PRODUCT_SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort, expected one of: {', '.join(PRODUCT_SORTS)}")
+    sort_field, direction = PRODUCT_SORTS.get(sort, ("_id", ASCENDING))
+    
+    if cursor:
+        filter_criteria = {"$and": [filter_criteria, keyset_filter(sort_field, direction, decode_cursor(cursor))]}
     
-    products = list(products_collection.find(filter_criteria, {"_id": 0}))
-    return {"products": products}
+    # Project the requested fields, plus whatever the cursor is built from
+    requested = None
+    projection = None
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in Product.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        projection = {field: 1 for field in requested}
+        projection[sort_field] = 1
+    
+    query = products_collection.find(filter_criteria, projection).sort([(sort_field, direction), ("_id", direction)])
+    return query, sort_field, requested
+
+def clean_product(product, sort_field, requested):
+    product.pop("_id", None)
+    if requested is not None and sort_field not in requested:
+        product.pop(sort_field, None)
+    return product
+
+async def load_products(category, brand, min_price, max_price, sort, limit, cursor, fields):
+    query, sort_field, requested = products_query(category, brand, min_price, max_price, sort, cursor, fields)
+    if limit:
+        query = query.limit(limit + 1)
+    products = await query.to_list(length=None)
+    
+    next_cursor = None
+    if limit and len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        next_cursor = encode_cursor(None if sort_field == "_id" else last[sort_field], last["_id"])
+    for product in products:
+        clean_product(product, sort_field, requested)
+    
+    return {"products": products, "next_cursor": next_cursor}
+
+async def stream_products(query, sort_field, requested):
+    async for batch in cursor_batches(query.batch_size(STREAM_BATCH_SIZE), STREAM_BATCH_SIZE):
+        yield [clean_product(product, sort_field, requested) for product in batch]
 
 @app.get("/api/products/{product_id}")
 async def get_product(product_id: str):
-    product = products_collection.find_one({"id": product_id}, {"_id": 0})
+    product = await catalog_cache.get_or_load(
+        ("product", product_id), lambda: products_collection.find_one({"id": product_id}, {"_id": 0})
+    )
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 @app.get("/api/categories")
 async def get_categories():
-    categories = list(categories_collection.find({}, {"_id": 0}))
+    return await catalog_cache.get_or_load(("categories",), load_categories)
+
+async def load_categories():
+    categories = await categories_collection.find({}, {"_id": 0, "product_count": 0}).to_list(length=None)
     return {"categories": categories}
 
 @app.get("/api/brands")
 async def get_brands():
-    brands = list(brands_collection.find({}, {"_id": 0}))
+    return await catalog_cache.get_or_load(("brands",), load_brands)
+
+async def load_brands():
+    brands = await brands_collection.find({}, {"_id": 0, "product_count": 0}).to_list(length=None)
     return {"brands": brands}
 
 # Cart endpoints
@@ -398,40 +1023,65 @@ async def add_to_cart(item: CartItem, user_data: dict = Depends(verify_token)):
     user_id = user_data["user_id"]
     
     # Check if product exists
-    product = products_collection.find_one({"id": item.product_id})
-    if not product:
+    if not await product_exists(item.product_id):
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Check if item already in cart
-    existing_item = cart_collection.find_one({"user_id": user_id, "product_id": item.product_id})
-    
-    if existing_item:
-        # Update quantity
-        cart_collection.update_one(
-            {"user_id": user_id, "product_id": item.product_id},
-            {"$set": {"quantity": existing_item["quantity"] + item.quantity}}
-        )
-    else:
-        # Add new item
-        cart_collection.insert_one({
-            "user_id": user_id,
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "added_at": datetime.utcnow()
-        })
+    # Add the item or bump its quantity in one atomic upsert
+    await cart_collection.update_one(
+        {"user_id": user_id, "product_id": item.product_id},
+        {"$inc": {"quantity": item.quantity}, "$setOnInsert": {"added_at": datetime.utcnow()}},
+        upsert=True
+    )
     
     return {"message": "Item added to cart"}
 
+@app.post("/api/cart/batch")
+async def batch_update_cart(batch: CartBatch, user_data: dict = Depends(verify_token)):
+    user_id = user_data["user_id"]
+    if not batch.replace and any(item.quantity == 0 for item in batch.items):
+        raise HTTPException(status_code=400, detail="Quantity must be positive when adding to the cart")
+    
+    # Merge repeated product ids: quantities add up, or the last one wins when replacing
+    quantities = {}
+    for item in batch.items:
+        if batch.replace:
+            quantities[item.product_id] = item.quantity
+        else:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
+    missing = await find_missing_products(list(quantities))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(missing)}")
+    
+    now = datetime.utcnow()
+    operations = []
+    for product_id, quantity in quantities.items():
+        key = {"user_id": user_id, "product_id": product_id}
+        if batch.replace and quantity <= 0:
+            operations.append(DeleteOne(key))
+        elif batch.replace:
+            operations.append(UpdateOne(key, {"$set": {"quantity": quantity}, "$setOnInsert": {"added_at": now}}, upsert=True))
+        else:
+            operations.append(UpdateOne(key, {"$inc": {"quantity": quantity}, "$setOnInsert": {"added_at": now}}, upsert=True))
+    if batch.replace:
+        operations.append(DeleteMany({"user_id": user_id, "product_id": {"$nin": list(quantities)}}))
+    
+    if operations:
+        await cart_collection.bulk_write(operations, ordered=False)
+    
+    return {"message": "Cart updated", "items": len(quantities)}
+
 @app.get("/api/cart")
 async def get_cart(user_data: dict = Depends(verify_token)):
     user_id = user_data["user_id"]
     
     # Get cart items
-    cart_items = list(cart_collection.find({"user_id": user_id}, {"_id": 0}))
+    cart_items = await cart_collection.find({"user_id": user_id}, {"_id": 0}).to_list(length=None)
     
-    # Populate with product details
+    # Populate with product details in a single round trip
+    products = await find_products_by_id([item["product_id"] for item in cart_items])
     for item in cart_items:
-        product = products_collection.find_one({"id": item["product_id"]}, {"_id": 0})
+        product = products.get(item["product_id"])
         if product:
             item["product"] = product
     
@@ -441,7 +1091,7 @@ async def get_cart(user_data: dict = Depends(verify_token)):
 async def remove_from_cart(product_id: str, user_data: dict = Depends(verify_token)):
     user_id = user_data["user_id"]
     
-    cart_collection.delete_one({"user_id": user_id, "product_id": product_id})
+    await cart_collection.delete_one({"user_id": user_id, "product_id": product_id})
     return {"message": "Item removed from cart"}
 
 # Order endpoints
@@ -449,64 +1099,33 @@ async def remove_from_cart(product_id: str, user_data: dict = Depends(verify_tok
 async def create_order(order_data: dict, user_data: dict = Depends(verify_token)):
     user_id = user_data["user_id"]
     
-    # Get cart items
-    cart_items = list(cart_collection.find({"user_id": user_id}))
-    if not cart_items:
-        raise HTTPException(status_code=400, detail="Cart is empty")
-    
-    # Calculate total
-    total_amount = 0
-    order_items = []
-    
-    for item in cart_items:
-        product = products_collection.find_one({"id": item["product_id"]})
-        if product:
-            item_total = product["price"] * item["quantity"]
-            total_amount += item_total
-            order_items.append({
-                "product_id": item["product_id"],
-                "product_name": product["name"],
-                "quantity": item["quantity"],
-                "price": product["price"],
-                "total": item_total
-            })
-    
-    # Create order
-    order = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "items": order_items,
-        "total_amount": total_amount,
-        "status": "pending",
-        "delivery_address": order_data.get("delivery_address", ""),
-        "order_date": datetime.utcnow(),
-        "delivery_date": None
-    }
-    
-    orders_collection.insert_one(order)
-    
-    # Clear cart
-    cart_collection.delete_many({"user_id": user_id})
+    order = await place_order(user_id, order_data.get("delivery_address", ""))
+    await invalidate_catalog(*[("product", item["product_id"]) for item in order["items"]])
+    await bump_stats({
+        "total_orders": 1,
+        "revenue_total": order["total_amount"],
+        **order_stats_increments(order["status"], order["total_amount"])
+    })
     
-    return {"order_id": order["id"], "total_amount": total_amount}
+    return {"order_id": order["id"], "total_amount": order["total_amount"]}
 
 @app.get("/api/orders")
 async def get_orders(user_data: dict = Depends(verify_token)):
     user_id = user_data["user_id"]
     
-    orders = list(orders_collection.find({"user_id": user_id}, {"_id": 0}))
-    return {"orders": orders}
+    orders = await orders_collection.find({"user_id": user_id}, {"_id": 0}).to_list(length=None)
+    return FastJSONResponse({"orders": orders})
 
 # Admin endpoints
 @app.post("/api/admin/login")
 async def admin_login(admin: AdminLogin):
     # Find admin user
-    db_user = users_collection.find_one({"email": admin.email, "role": "admin"})
+    db_user = await users_collection.find_one({"email": admin.email, "role": "admin"})
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid admin credentials")
     
     # Verify password
-    if not bcrypt.checkpw(admin.password.encode('utf-8'), db_user["password"].encode('utf-8')):
+    if not await password_hasher.verify(admin.password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid admin credentials")
     
     # Generate token
@@ -521,40 +1140,56 @@ async def admin_login(admin: AdminLogin):
 
 @app.get("/api/admin/dashboard")
 async def admin_dashboard(admin_data: dict = Depends(verify_admin_token)):
-    # Get statistics
-    total_products = products_collection.count_documents({})
-    total_categories = categories_collection.count_documents({})
-    total_brands = brands_collection.count_documents({})
-    total_users = users_collection.count_documents({"role": {"$ne": "admin"}})
-    total_orders = orders_collection.count_documents({})
-    
-    # Get recent orders
-    recent_orders = list(orders_collection.find({}, {"_id": 0}).sort("order_date", -1).limit(5))
-    
-    # Get order status distribution
-    order_statuses = list(orders_collection.aggregate([
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]))
+    return await dashboard_snapshot.get()
+
+async def compute_dashboard():
+    stats, recent_orders = await asyncio.gather(
+        stats_collection.find_one({"_id": STATS_ID}),
+        orders_collection.find({}, {"_id": 0}).sort("order_date", -1).limit(5).to_list(length=None),
+    )
+    stats = stats or {}
     
     return {
         "statistics": {
-            "total_products": total_products,
-            "total_categories": total_categories,
-            "total_brands": total_brands,
-            "total_users": total_users,
-            "total_orders": total_orders
+            "total_products": stats.get("total_products", 0),
+            "total_categories": stats.get("total_categories", 0),
+            "total_brands": stats.get("total_brands", 0),
+            "total_users": stats.get("total_users", 0),
+            "total_orders": stats.get("total_orders", 0),
+            "total_revenue": stats.get("revenue_total", 0)
         },
         "recent_orders": recent_orders,
-        "order_statuses": order_statuses
+        "order_statuses": [
+            {"_id": order_status, "count": count}
+            for order_status, count in stats.get("orders_by_status", {}).items() if count
+        ]
+    }
+
+# Admins share one dashboard snapshot, recomputed in the background once stale
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', '5'))
+dashboard_snapshot = RefreshingValue(compute_dashboard, DASHBOARD_CACHE_TTL)
+
+@app.get("/api/admin/cache/stats")
+async def cache_stats(admin_data: dict = Depends(verify_admin_token)):
+    return {
+        "catalog": catalog_cache.stats(),
+        "invalidation": {"mode": catalog_invalidator.mode, "received": catalog_invalidator.received},
     }
 
 # Product Management
 @app.post("/api/admin/products")
 async def create_product(product: ProductCreate, admin_data: dict = Depends(verify_admin_token)):
-    product_data = product.dict()
+    product_data = product.dict(exclude_none=True)
     product_data["id"] = str(uuid.uuid4())
     
-    products_collection.insert_one(product_data)
+    try:
+        await products_collection.insert_one(product_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    await bump_stats({"total_products": 1})
+    await bump_product_counts(product_data["category"], product_data["brand"])
+    product_ids.add(product_data["id"])
+    await invalidate_catalog(("products",))
     return {"message": "Product created successfully", "product_id": product_data["id"]}
 
 @app.put("/api/admin/products/{product_id}")
@@ -564,55 +1199,292 @@ async def update_product(product_id: str, product: ProductUpdate, admin_data: di
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    result = products_collection.update_one({"id": product_id}, {"$set": update_data})
+    previous = await products_collection.find_one_and_update(
+        {"id": product_id},
+        {"$set": update_data},
+        projection={"_id": 0, "category": 1, "brand": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    await invalidate_catalog(("products",), ("product", product_id))
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    # Move the product between category/brand counters if either changed
+    if update_data.get("category", previous["category"]) != previous["category"]:
+        await categories_collection.update_one({"name": previous["category"]}, {"$inc": {"product_count": -1}})
+        await categories_collection.update_one({"name": update_data["category"]}, {"$inc": {"product_count": 1}})
+    if update_data.get("brand", previous["brand"]) != previous["brand"]:
+        await brands_collection.update_one({"name": previous["brand"]}, {"$inc": {"product_count": -1}})
+        await brands_collection.update_one({"name": update_data["brand"]}, {"$inc": {"product_count": 1}})
+    
     return {"message": "Product updated successfully"}
 
 @app.delete("/api/admin/products/{product_id}")
 async def delete_product(product_id: str, admin_data: dict = Depends(verify_admin_token)):
-    result = products_collection.delete_one({"id": product_id})
+    deleted = await products_collection.find_one_and_delete(
+        {"id": product_id}, projection={"_id": 0, "category": 1, "brand": 1}
+    )
+    await invalidate_catalog(("products",), ("product", product_id), ("product_deleted", product_id))
     
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Product not found")
+    await bump_stats({"total_products": -1})
+    await bump_product_counts(deleted["category"], deleted["brand"], sign=-1)
     
     return {"message": "Product deleted successfully"}
 
+# Bulk import. Rows are validated one by one, then written in unordered
+# bulk_write chunks; a bad row is reported by its number and never blocks
+# the rest of the file. Modes:
+#   create  insert every row as a new product (SKU optional)
+#   upsert  insert or replace the fields of the product with the row's SKU
+#   update  set only the columns present (e.g. price, stock) on the product
+#           with the row's SKU, or its id when there is no sku column
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', '1000'))
+BULK_MAX_ERRORS = 1000
+BULK_MODES = ("create", "upsert", "update")
+
+def parse_bulk_rows(body, format):
+    text = body.decode("utf-8-sig")
+    if format == "csv":
+        for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            # Blank cells mean "not given", which matters for partial updates
+            yield number, {key.strip(): value.strip() for key, value in row.items()
+                           if key and isinstance(value, str) and value.strip()}
+        return
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, f"Invalid JSON: {e}"
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+def validation_message(error):
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+async def apply_bulk_chunk(mode, chunk, report):
+    key_field = chunk[0][1]
+    keys = [key for _, _, key, _ in chunk if key is not None]
+    existing = {}
+    if keys:
+        async for product in products_collection.find(
+            {key_field: {"$in": keys}}, {"_id": 0, "id": 1, key_field: 1, "category": 1, "brand": 1}
+        ):
+            existing[product[key_field]] = product
+    
+    operations = []
+    rows = []
+    for number, _, key, data in chunk:
+        previous = existing.get(key) if key is not None else None
+        if mode == "create":
+            if previous is not None:
+                report.error(number, "SKU already exists")
+                continue
+            data["id"] = str(uuid.uuid4())
+            operations.append(InsertOne(data))
+        elif mode == "upsert":
+            if previous is None:
+                product_id = str(uuid.uuid4())
+                operations.append(UpdateOne({"sku": key}, {"$set": data, "$setOnInsert": {"id": product_id}}, upsert=True))
+                data = {**data, "id": product_id}
+            else:
+                operations.append(UpdateOne({"sku": key}, {"$set": data}))
+        else:
+            if previous is None:
+                report.error(number, "Product not found")
+                continue
+            operations.append(UpdateOne({key_field: key}, {"$set": data}))
+        rows.append((number, data, previous))
+    if not operations:
+        return
+    
+    try:
+        result = (await products_collection.bulk_write(operations, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+    failed = set()
+    for error in result.get("writeErrors", []):
+        failed.add(error["index"])
+        message = "SKU already exists" if error.get("code") == 11000 else error.get("errmsg", "Write failed")
+        report.error(rows[error["index"]][0], message)
+    inserted = {entry["index"] for entry in result.get("upserted", [])}
+    
+    # Keep product_ids, the dashboard stats and the category/brand counters in step
+    categories, brands = Counter(), Counter()
+    for index, (_, data, previous) in enumerate(rows):
+        if index in failed:
+            continue
+        if mode == "create" or index in inserted:
+            report.created += 1
+            product_ids.add(data["id"])
+            categories[data["category"]] += 1
+            brands[data["brand"]] += 1
+            continue
+        report.updated += 1
+        if previous is None:
+            continue
+        if data.get("category", previous["category"]) != previous["category"]:
+            categories[previous["category"]] -= 1
+            categories[data["category"]] += 1
+        if data.get("brand", previous["brand"]) != previous["brand"]:
+            brands[previous["brand"]] -= 1
+            brands[data["brand"]] += 1
+    for collection, counts in ((categories_collection, categories), (brands_collection, brands)):
+        changes = [UpdateOne({"name": name}, {"$inc": {"product_count": count}}) for name, count in counts.items() if count]
+        if changes:
+            await collection.bulk_write(changes, ordered=False)
+
+class BulkReport:
+    def __init__(self):
+        self.received = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+    
+    def error(self, row, message):
+        self.error_count += 1
+        if len(self.errors) < BULK_MAX_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+@app.post("/api/admin/products/bulk")
+async def bulk_import_products(
+    request: Request,
+    mode: str = "upsert",
+    format: Optional[str] = None,
+    admin_data: dict = Depends(verify_admin_token),
+):
+    if mode not in BULK_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode, expected one of: {', '.join(BULK_MODES)}")
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson" if "ndjson" in content_type else None
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson")
+    
+    report = BulkReport()
+    seen = set()
+    chunk = []
+    key_field = None
+    for number, row in parse_bulk_rows(await request.body(), format):
+        report.received += 1
+        if isinstance(row, str):
+            report.error(number, row)
+            continue
+        try:
+            if mode == "update":
+                data = {k: v for k, v in ProductUpdate(**row).dict().items() if v is not None}
+                if not data:
+                    raise ValueError("No fields to update")
+            else:
+                data = ProductCreate(**row).dict(exclude_none=True)
+        except ValidationError as e:
+            report.error(number, validation_message(e))
+            continue
+        except ValueError as e:
+            report.error(number, str(e))
+            continue
+        
+        # Updates are keyed by SKU, falling back to id; the whole file uses one key
+        row_key_field = "sku" if mode != "update" or row.get("sku") else "id"
+        key = row.get(row_key_field)
+        key = str(key) if key is not None else None
+        if key is None and mode != "create":
+            report.error(number, f"Missing {row_key_field}")
+            continue
+        if mode == "update":
+            key_field = key_field or row_key_field
+            if row_key_field != key_field:
+                report.error(number, f"Expected a {key_field} like the rows before it")
+                continue
+        if key is not None:
+            if key in seen:
+                report.error(number, f"Duplicate {row_key_field} in upload")
+                continue
+            seen.add(key)
+        chunk.append((number, row_key_field, key, data))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await apply_bulk_chunk(mode, chunk, report)
+            chunk = []
+    if chunk:
+        await apply_bulk_chunk(mode, chunk, report)
+    
+    if report.created:
+        await bump_stats({"total_products": report.created})
+    if report.created or report.updated:
+        await invalidate_catalog(("products",), ("product",))
+    
+    return {
+        "message": f"Processed {report.received} rows",
+        "mode": mode,
+        "received": report.received,
+        "created": report.created,
+        "updated": report.updated,
+        "error_count": report.error_count,
+        "errors": sorted(report.errors, key=lambda error: error["row"]),
+    }
+
 # Category Management
 @app.post("/api/admin/categories")
 async def create_category(category: CategoryCreate, admin_data: dict = Depends(verify_admin_token)):
     # Check if category already exists
-    if categories_collection.find_one({"name": category.name}):
+    if await categories_collection.find_one({"name": category.name}):
         raise HTTPException(status_code=400, detail="Category already exists")
     
     category_data = category.dict()
     category_data["id"] = str(uuid.uuid4())
+    category_data["product_count"] = await products_collection.count_documents({"category": category.name})
     
-    categories_collection.insert_one(category_data)
+    try:
+        await categories_collection.insert_one(category_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Category already exists")
+    await bump_stats({"total_categories": 1})
+    await invalidate_catalog(("categories",))
     return {"message": "Category created successfully", "category_id": category_data["id"]}
 
 @app.put("/api/admin/categories/{category_id}")
 async def update_category(category_id: str, category: CategoryCreate, admin_data: dict = Depends(verify_admin_token)):
-    result = categories_collection.update_one({"id": category_id}, {"$set": category.dict()})
+    try:
+        previous = await categories_collection.find_one_and_update(
+            {"id": category_id},
+            {"$set": category.dict()},
+            projection={"_id": 0, "name": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Category already exists")
+    await invalidate_catalog(("categories",))
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
+    # Products reference categories by name, so a rename cascades to them
+    if previous["name"] != category.name:
+        await products_collection.update_many({"category": previous["name"]}, {"$set": {"category": category.name}})
+        await invalidate_catalog(("products",), ("product",))
+    
     return {"message": "Category updated successfully"}
 
 @app.delete("/api/admin/categories/{category_id}")
 async def delete_category(category_id: str, admin_data: dict = Depends(verify_admin_token)):
     # Check if category is being used by any products
-    category_name = categories_collection.find_one({"id": category_id})
-    if category_name and products_collection.find_one({"category": category_name["name"]}):
+    existing = await categories_collection.find_one({"id": category_id}, {"_id": 0, "product_count": 1})
+    if existing and existing.get("product_count", 0) > 0:
         raise HTTPException(status_code=400, detail="Cannot delete category that is being used by products")
     
-    result = categories_collection.delete_one({"id": category_id})
+    result = await categories_collection.delete_one({"id": category_id})
+    await invalidate_catalog(("categories",))
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    await bump_stats({"total_categories": -1})
     
     return {"message": "Category deleted successfully"}
 
@@ -620,68 +1492,177 @@ async def delete_category(category_id: str, admin_data: dict = Depends(verify_ad
 @app.post("/api/admin/brands")
 async def create_brand(brand: BrandCreate, admin_data: dict = Depends(verify_admin_token)):
     # Check if brand already exists
-    if brands_collection.find_one({"name": brand.name}):
+    if await brands_collection.find_one({"name": brand.name}):
         raise HTTPException(status_code=400, detail="Brand already exists")
     
     brand_data = brand.dict()
     brand_data["id"] = str(uuid.uuid4())
+    brand_data["product_count"] = await products_collection.count_documents({"brand": brand.name})
     
-    brands_collection.insert_one(brand_data)
+    try:
+        await brands_collection.insert_one(brand_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Brand already exists")
+    await bump_stats({"total_brands": 1})
+    await invalidate_catalog(("brands",))
     return {"message": "Brand created successfully", "brand_id": brand_data["id"]}
 
 @app.put("/api/admin/brands/{brand_id}")
 async def update_brand(brand_id: str, brand: BrandCreate, admin_data: dict = Depends(verify_admin_token)):
-    result = brands_collection.update_one({"id": brand_id}, {"$set": brand.dict()})
+    try:
+        previous = await brands_collection.find_one_and_update(
+            {"id": brand_id},
+            {"$set": brand.dict()},
+            projection={"_id": 0, "name": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Brand already exists")
+    await invalidate_catalog(("brands",))
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Brand not found")
     
+    # Products reference brands by name, so a rename cascades to them
+    if previous["name"] != brand.name:
+        await products_collection.update_many({"brand": previous["name"]}, {"$set": {"brand": brand.name}})
+        await invalidate_catalog(("products",), ("product",))
+    
     return {"message": "Brand updated successfully"}
 
 @app.delete("/api/admin/brands/{brand_id}")
 async def delete_brand(brand_id: str, admin_data: dict = Depends(verify_admin_token)):
     # Check if brand is being used by any products
-    brand_name = brands_collection.find_one({"id": brand_id})
-    if brand_name and products_collection.find_one({"brand": brand_name["name"]}):
+    existing = await brands_collection.find_one({"id": brand_id}, {"_id": 0, "product_count": 1})
+    if existing and existing.get("product_count", 0) > 0:
         raise HTTPException(status_code=400, detail="Cannot delete brand that is being used by products")
     
-    result = brands_collection.delete_one({"id": brand_id})
+    result = await brands_collection.delete_one({"id": brand_id})
+    await invalidate_catalog(("brands",))
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Brand not found")
+    await bump_stats({"total_brands": -1})
     
     return {"message": "Brand deleted successfully"}
 
 # Order Management
 @app.get("/api/admin/orders")
-async def get_all_orders(admin_data: dict = Depends(verify_admin_token)):
-    orders = list(orders_collection.find({}, {"_id": 0}).sort("order_date", -1))
+async def get_all_orders(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    user_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    admin_data: dict = Depends(verify_admin_token),
+):
+    filter_criteria = {}
+    if status_filter:
+        filter_criteria["status"] = status_filter
+    if user_id:
+        filter_criteria["user_id"] = user_id
+    if date_from or date_to:
+        filter_criteria["order_date"] = {}
+        if date_from:
+            filter_criteria["order_date"]["$gte"] = date_from
+        if date_to:
+            filter_criteria["order_date"]["$lte"] = date_to
+    if cursor:
+        order_date, object_id = decode_cursor(cursor)
+        try:
+            position = (datetime.fromisoformat(order_date), object_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        filter_criteria = {"$and": [filter_criteria, keyset_filter("order_date", DESCENDING, position)]}
+    
+    query = orders_collection.find(filter_criteria).sort([("order_date", DESCENDING), ("_id", DESCENDING)])
+    if not limit:
+        # Exports: stream from the cursor instead of holding every order
+        return StreamingJSONResponse(
+            stream_orders(query), "orders", {"next_cursor": None}, ndjson=wants_ndjson(request)
+        )
+    orders = await query.limit(limit + 1).to_list(length=None)
     
-    # Get user details for each order
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1]["order_date"].isoformat(), orders[-1]["_id"])
+    
+    await attach_user_details(orders)
+    return FastJSONResponse({"orders": orders, "next_cursor": next_cursor})
+
+async def attach_user_details(orders):
+    # Get user details for the whole page in one query
+    user_ids = list({order["user_id"] for order in orders})
+    users = {}
+    if user_ids:
+        async for user in users_collection.find({"id": {"$in": user_ids}}, {"_id": 0, "password": 0}):
+            users[user["id"]] = user
     for order in orders:
-        user = users_collection.find_one({"id": order["user_id"]}, {"_id": 0, "password": 0})
+        order.pop("_id", None)
+        user = users.get(order["user_id"])
         if user:
             order["user_details"] = user
-    
-    return {"orders": orders}
+    return orders
+
+async def stream_orders(query):
+    async for batch in cursor_batches(query.batch_size(STREAM_BATCH_SIZE), STREAM_BATCH_SIZE):
+        yield await attach_user_details(batch)
 
 @app.put("/api/admin/orders/{order_id}/status")
 async def update_order_status(order_id: str, status_update: OrderStatusUpdate, admin_data: dict = Depends(verify_admin_token)):
-    result = orders_collection.update_one(
+    if not status_update.status or "." in status_update.status or status_update.status.startswith("$"):
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    previous = await orders_collection.find_one_and_update(
         {"id": order_id}, 
-        {"$set": {"status": status_update.status}}
+        {"$set": {"status": status_update.status}},
+        projection={"_id": 0, "status": 1, "total_amount": 1},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    if previous.get("status") != status_update.status:
+        amount = previous.get("total_amount", 0)
+        await bump_stats({
+            **order_stats_increments(previous.get("status"), amount, sign=-1),
+            **order_stats_increments(status_update.status, amount)
+        })
+    
     return {"message": "Order status updated successfully"}
 
+# Slow command log
+@app.get("/api/admin/slow-commands")
+async def get_slow_commands(
+    collection: Optional[str] = None,
+    command: Optional[str] = None,
+    route: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    admin_data: dict = Depends(verify_admin_token),
+):
+    if slow_commands is None:
+        raise HTTPException(status_code=404, detail="Slow command recording is disabled")
+    
+    filter_criteria = {}
+    if collection:
+        filter_criteria["collection"] = collection
+    if command:
+        filter_criteria["command"] = command
+    if route:
+        filter_criteria["route"] = route
+    # Capped collections keep insertion order, so newest first is a reverse scan
+    entries = await db[SLOW_COMMANDS_COLLECTION].find(filter_criteria, {"_id": 0}).sort("$natural", -1).limit(limit).to_list(length=None)
+    return {"recorder": slow_commands.stats(), "slow_commands": entries}
+
 # User Management
 @app.get("/api/admin/users")
-async def get_all_users(admin_data: dict = Depends(verify_admin_token)):
-    users = list(users_collection.find({"role": {"$ne": "admin"}}, {"_id": 0, "password": 0}))
-    return {"users": users}
+async def get_all_users(request: Request, admin_data: dict = Depends(verify_admin_token)):
+    query = users_collection.find({"role": {"$ne": "admin"}}, {"_id": 0, "password": 0}).batch_size(STREAM_BATCH_SIZE)
+    return StreamingJSONResponse(cursor_batches(query, STREAM_BATCH_SIZE), "users", ndjson=wants_ndjson(request))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from datetime import datetime
+
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+LOG_COLLECTION = "slow_commands"
+LOG_SIZE_BYTES = 16 * 1024 * 1024
+FLUSH_INTERVAL = 1.0
+EXPLAIN_TIMEOUT_MS = 5000
+# Each command shape is explained at most once per interval, and at most
+# MAX_EXPLAINS per flush, so a hot slow query is not run twice as often
+EXPLAIN_INTERVAL = 60.0
+MAX_EXPLAINS = 20
+# Commands whose plan explain() can describe
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+# Never recorded: our own explains and writes, and cursor plumbing
+IGNORED = {"explain", "getMore", "killCursors", "endSessions", "hello", "isMaster", "ping", "saslStart", "saslContinue"}
+# Parts of a command that describe its shape
+SHAPE_FIELDS = ("filter", "query", "q", "pipeline", "sort", "projection", "update", "u", "key", "updates", "deletes")
+# Commands that take a server-side time limit
+TIME_LIMITED = {"find", "aggregate", "count", "distinct", "findAndModify"}
+# Session and routing fields that explain() rejects
+EXPLAIN_STRIP = {"lsid", "txnNumber", "autocommit", "startTransaction", "writeConcern", "readConcern", "$db",
+                 "$clusterTime", "$readPreference"}
+
+# The ASGI scope of the request being handled; Motor copies the context into
+# the thread that runs each command, so listeners can see the calling route
+current_scope = contextvars.ContextVar("current_scope", default=None)
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+def redact(value):
+    """Keep keys and operators, replace every value with "?"."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Arrays of statements (pipelines, bulk updates) keep each distinct
+        # shape; value lists such as $in collapse to one placeholder
+        if value and all(isinstance(item, dict) for item in value):
+            shapes = []
+            for item in value:
+                shape = redact(item)
+                if shape not in shapes:
+                    shapes.append(shape)
+            return shapes
+        return ["?"]
+    return "?"
+
+
+def command_shape(command_name, command):
+    # "update" is the collection name on update commands, the document on findAndModify
+    return {field: redact(command[field]) for field in SHAPE_FIELDS if field in command and field != command_name}
+
+
+def calling_route():
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+def explain_summary(explain):
+    """Indexes used, documents/keys examined and documents returned."""
+    indexes = set()
+    stages = set()
+    stats = {}
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.add(node["stage"])
+            if "indexName" in node:
+                indexes.add(node["indexName"])
+            if "executionStats" in node and not stats:
+                stats.update(node["executionStats"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(explain)
+    return {
+        "indexes": sorted(indexes),
+        "collection_scan": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowCommandRecorder(monitoring.CommandListener):
+    """Records commands slower than ``threshold_ms`` to a capped collection.
+
+    Listener callbacks run on pymongo's threads and only queue a record; a
+    task on the event loop explains the queued commands and writes them out.
+    Only the redacted shape is stored, never the values. Repeats of a shape
+    explained in the last ``explain_interval`` seconds reuse its summary
+    (marked ``cached``) instead of running explain again.
+    """
+
+    def __init__(self, threshold_ms, max_pending=1000, explain_interval=EXPLAIN_INTERVAL, max_explains=MAX_EXPLAINS):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.max_explains = max_explains
+        self.recorded = 0
+        self.dropped = 0
+        self.explained = 0
+        self._inflight = {}
+        self._pending = deque()
+        self._max_pending = max_pending
+        self._summaries = {}
+        self._client = None
+        self._task = None
+
+    def started(self, event):
+        if event.command_name in IGNORED:
+            return
+        collection = event.command.get(event.command_name)
+        if collection == LOG_COLLECTION:
+            return
+        self._inflight[(event.connection_id, event.request_id)] = (
+            event.database_name,
+            collection if isinstance(collection, str) else None,
+            calling_route(),
+            event.command,
+        )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed):
+        started = self._inflight.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        if len(self._pending) >= self._max_pending:
+            self.dropped += 1
+            return
+        # Shapes are only worked out for the few commands that turn out slow
+        database, collection, route, command = started
+        self._pending.append({
+            "at": datetime.utcnow(),
+            "database": database,
+            "collection": collection,
+            "command": event.command_name,
+            "duration_ms": duration_ms,
+            "route": route,
+            "shape": command_shape(event.command_name, command),
+            "failed": failed,
+            "_explain": command if event.command_name in EXPLAINABLE else None,
+        })
+
+    async def start(self, client, database):
+        self._client = client
+        try:
+            await client[database].create_collection(LOG_COLLECTION, capped=True, size=LOG_SIZE_BYTES)
+        except CollectionInvalid:
+            pass
+        self._task = asyncio.create_task(self._run(client[database][LOG_COLLECTION]))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, log):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            if not self._pending:
+                continue
+            records = []
+            while self._pending:
+                records.append(self._pending.popleft())
+            try:
+                await self._explain_records(records)
+                await log.insert_many(records)
+                self.recorded += len(records)
+            except PyMongoError as e:
+                logger.warning("Could not record slow commands: %s", e)
+
+    async def _explain_records(self, records):
+        now = time.monotonic()
+        for key in [key for key, (_, at) in self._summaries.items() if now - at >= self.explain_interval]:
+            del self._summaries[key]
+        explains = 0
+        for record in records:
+            command = record.pop("_explain")
+            if command is None:
+                record["explain"] = None
+                continue
+            key = (record["database"], record["collection"], record["command"], repr(record["shape"]))
+            cached = self._summaries.get(key)
+            if cached is not None:
+                record["explain"] = dict(cached[0], cached=True)
+                continue
+            if explains >= self.max_explains:
+                record["explain"] = {"skipped": "explain limit reached for this flush"}
+                continue
+            explains += 1
+            summary = await self._explain(command, record["database"])
+            summary["explained_at"] = datetime.utcnow()
+            self._summaries[key] = (summary, now)
+            record["explain"] = summary
+        self.explained += explains
+
+    async def _explain(self, command, database):
+        name = next(iter(command))
+        command = {key: value for key, value in command.items() if key not in EXPLAIN_STRIP}
+        # explain() takes one write statement; the first stands in for the batch
+        for statements in ("updates", "deletes"):
+            if statements in command:
+                command[statements] = command[statements][:1]
+        if name in TIME_LIMITED:
+            command.setdefault("maxTimeMS", EXPLAIN_TIMEOUT_MS)
+        started = time.perf_counter()
+        try:
+            explain = await self._client[database].command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+        except PyMongoError as e:
+            return {"error": str(e)}
+        summary = explain_summary(explain)
+        summary["explain_ms"] = (time.perf_counter() - started) * 1000
+        return summary
+
+    def stats(self):
+        return {
+            "threshold_ms": self.threshold_ms,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "explained": self.explained,
+            "pending": len(self._pending),
+        }
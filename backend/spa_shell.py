@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+
+from fastapi.responses import HTMLResponse, Response
+
+from compression import negotiate_encoding
+
+try:
+    import brotli
+except ImportError:  # the shell is then kept gzipped and plain only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class SpaShell:
+    """An HTML shell held in memory with precompressed variants and ETags.
+
+    The file is read and compressed once. With ``reload`` set, a background
+    task watches its mtime and swaps in the new content, for development.
+    """
+
+    def __init__(self, path, reload=False, poll_interval=1.0):
+        self.path = path
+        self.reload = reload
+        self.poll_interval = poll_interval
+        self.error = None
+        self.variants = {}
+        self.etags = {}
+        self._mtime = None
+        self._task = None
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                body = f.read()
+            self._mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            # Keep serving the last good copy if a reload races an editor's save
+            self.error = str(e)
+            if self.variants:
+                logger.warning("Could not reload %s: %s", self.path, e)
+            return
+        self.error = None
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        self.variants = variants
+        # Strong validators must differ per representation
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in variants
+        }
+
+    async def start(self):
+        self.load()
+        if self.reload:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != self._mtime:
+                logger.info("Reloading %s", self.path)
+                self.load()
+
+    def response(self, request):
+        if not self.variants:
+            return HTMLResponse(content=f"<h1>Admin Panel Loading...</h1><p>Error: {self.error}</p>", status_code=500)
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), self.variants)
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etags[encoding]):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type="text/html", headers=headers)
@@ -0,0 +1,1365 @@
+#!/usr/bin/env python3
+"""Performance benchmarks for the Hyperpure backend.
+
+Run against a locally started server backed by a local mongod:
+
+    cd backend && uvicorn server:app --port 8001
+    python backend_bench.py concurrency --clients 64 --duration 10
+    python backend_bench.py cart --sizes 1 10 40 --json cart-after.json
+    python backend_bench.py checkout --buyers 200 --stock 50
+    python backend_bench.py products --catalog-sizes 10000 100000
+    python backend_bench.py invalidation --rounds 50
+    python backend_bench.py login-storm --logins 32 --duration 10
+    python backend_bench.py auth --iterations 100000
+    python backend_bench.py admin-orders --orders 100000
+    python backend_bench.py category-admin --catalog-size 100000
+    python backend_bench.py admin-shell --clients 64
+    python backend_bench.py static --clients 64
+    python backend_bench.py encoding --orders 10000
+    python backend_bench.py export --orders 1000000
+    python backend_bench.py bulk-import --rows 100000
+    python backend_bench.py startup --runs 5
+    python backend_bench.py metrics-overhead --clients 32
+    python backend_bench.py load --users 200 --duration 60 --json load-before.json
+
+To compare before/after, run the same benchmark against each build and diff
+the --json output.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from pymongo import MongoClient, UpdateOne
+
+try:
+    import aiohttp
+except ImportError:  # only the load scenario needs it
+    aiohttp = None
+
+# Configuration
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+ADMIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "admin")
+BASE_URL = "http://localhost:8001"
+API_URL = f"{BASE_URL}/api"
+ADMIN_CREDENTIALS = {"email": "admin@joshibrothers.com", "password": "Admin@123"}
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+DB_NAME = "joshi_brothers_db"
+BENCH_MARKER = "Benchmark fixture"
+BENCH_EMAIL_DOMAIN = "bench.example.com"
+ORDER_STATUSES = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+
+# ANSI colors for output
+class Colors:
+    HEADER = '\033[95m'
+    OKBLUE = '\033[94m'
+    OKGREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+
+def print_header(message):
+    print(f"\n{Colors.HEADER}{Colors.BOLD}{'=' * 80}{Colors.ENDC}")
+    print(f"{Colors.HEADER}{Colors.BOLD}{message.center(80)}{Colors.ENDC}")
+    print(f"{Colors.HEADER}{Colors.BOLD}{'=' * 80}{Colors.ENDC}\n")
+
+def print_info(message):
+    print(f"[INFO] {message}")
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def print_latency_table(results):
+    print(f"{'endpoint'.ljust(32)}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in results.items():
+        print(
+            f"{name.ljust(32)}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.1f}"
+            f"{row['p50']:>10.2f}{row['p95']:>10.2f}{row['p99']:>10.2f}"
+        )
+
+def register_bench_user(session):
+    email = f"bench_{int(time.time() * 1000)}_{threading.get_ident()}@example.com"
+    response = session.post(f"{API_URL}/auth/register", json={
+        "name": "Bench User",
+        "email": email,
+        "password": "Bench@123",
+    })
+    response.raise_for_status()
+    return response.json()["token"]
+
+def admin_headers(session):
+    response = session.post(f"{API_URL}/admin/login", json=ADMIN_CREDENTIALS)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def ensure_products(session, count):
+    """Return at least ``count`` product ids, creating bench products if the catalog is smaller."""
+    products = session.get(f"{API_URL}/products").json()["products"]
+    ids = [product["id"] for product in products]
+    if len(ids) < count:
+        headers = admin_headers(session)
+        for index in range(len(ids), count):
+            response = session.post(f"{API_URL}/admin/products", headers=headers, json={
+                "name": f"Bench Product {index}",
+                "description": BENCH_MARKER,
+                "price": 10.0 + index,
+                "category": "Dairy",
+                "brand": "Amul",
+                "image_url": "",
+                "stock": 1000000,
+                "unit": "1kg",
+            })
+            response.raise_for_status()
+            ids.append(response.json()["product_id"])
+    return ids[:count]
+
+def timed_requests(session, method, url, iterations, **kwargs):
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request_started = time.perf_counter()
+        response = session.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code != 200:
+            errors += 1
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+def summarize(latencies, errors, elapsed):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+    }
+
+def hammer(path, clients, duration, headers=None, expected=(200,), base_url=None):
+    """Issue GET requests to ``path`` from ``clients`` threads for ``duration`` seconds."""
+    url = f"{base_url or API_URL}{path}"
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        local, local_errors = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = session.get(url, headers=headers)
+                if response.status_code not in expected:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(worker)
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+def bench_concurrency(args):
+    print_header("CONCURRENT CLIENT THROUGHPUT")
+    print_info(f"{args.clients} clients, {args.duration}s per endpoint against {API_URL}")
+
+    session = requests.Session()
+    token = register_bench_user(session)
+    auth = {"Authorization": f"Bearer {token}"}
+    products = session.get(f"{API_URL}/products").json()["products"]
+    if products:
+        session.post(f"{API_URL}/cart/add", json={"product_id": products[0]["id"], "quantity": 1}, headers=auth)
+
+    scenarios = {
+        "GET /api/products": ("/products", None),
+        "GET /api/categories": ("/categories", None),
+        "GET /api/brands": ("/brands", None),
+        "GET /api/cart": ("/cart", auth),
+        "GET /api/orders": ("/orders", auth),
+    }
+    if products:
+        scenarios["GET /api/products/{id}"] = (f"/products/{products[0]['id']}", None)
+
+    results = {}
+    for name, (path, headers) in scenarios.items():
+        results[name] = hammer(path, args.clients, args.duration, headers)
+    print_latency_table(results)
+    return results
+
+def bench_cart(args):
+    print_header("GET /api/cart LATENCY BY CART SIZE")
+    session = requests.Session()
+    product_ids = ensure_products(session, max(args.sizes))
+
+    results = {}
+    for size in args.sizes:
+        headers = {"Authorization": f"Bearer {register_bench_user(session)}"}
+        for product_id in product_ids[:size]:
+            session.post(f"{API_URL}/cart/add", json={"product_id": product_id, "quantity": 1}, headers=headers)
+        results[f"{size} items"] = timed_requests(session, "GET", f"{API_URL}/cart", args.iterations, headers=headers)
+    print_latency_table(results)
+    return results
+
+def create_bench_product(session, headers, stock):
+    response = session.post(f"{API_URL}/admin/products", headers=headers, json={
+        "name": f"Checkout Bench {int(time.time() * 1000)}",
+        "description": "Checkout stress fixture",
+        "price": 100.0,
+        "category": "Dairy",
+        "brand": "Amul",
+        "image_url": "",
+        "stock": stock,
+        "unit": "1kg",
+    })
+    response.raise_for_status()
+    return response.json()["product_id"]
+
+def bench_checkout(args):
+    print_header("CONCURRENT CHECKOUT STRESS TEST")
+    session = requests.Session()
+    product_id = create_bench_product(session, admin_headers(session), args.stock)
+    print_info(f"{args.buyers} buyers competing for {args.stock} units of {product_id}")
+
+    buyers = []
+    for _ in range(args.buyers):
+        headers = {"Authorization": f"Bearer {register_bench_user(session)}"}
+        session.post(f"{API_URL}/cart/add", json={"product_id": product_id, "quantity": 1}, headers=headers)
+        buyers.append(headers)
+
+    barrier = threading.Barrier(len(buyers))
+
+    def buy(headers):
+        buyer_session = requests.Session()
+        barrier.wait()
+        started = time.perf_counter()
+        response = buyer_session.post(f"{API_URL}/orders", json={"delivery_address": "Bench"}, headers=headers)
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(buyers)) as pool:
+        outcomes = list(pool.map(buy, buyers))
+    elapsed = time.perf_counter() - started
+
+    placed = sum(1 for status_code, _ in outcomes if status_code == 200)
+    rejected = sum(1 for status_code, _ in outcomes if status_code == 400)
+    remaining = session.get(f"{API_URL}/products/{product_id}").json()["stock"]
+    oversold = placed > args.stock or remaining != args.stock - placed
+
+    print_info(f"placed {placed}, rejected {rejected}, other {len(outcomes) - placed - rejected}, stock left {remaining}")
+    print_info(f"{placed / elapsed:.1f} orders/sec, p99 {percentile([ms for _, ms in outcomes], 99):.2f} ms")
+    if oversold:
+        print(f"{Colors.FAIL}[FAIL] Oversold: stock accounting does not match placed orders{Colors.ENDC}")
+    else:
+        print(f"{Colors.OKGREEN}[PASS] No oversell{Colors.ENDC}")
+    return {
+        "buyers": args.buyers,
+        "stock": args.stock,
+        "placed": placed,
+        "rejected": rejected,
+        "remaining_stock": remaining,
+        "oversold": oversold,
+        "orders_per_sec": placed / elapsed if elapsed else 0.0,
+    }
+
+def seed_catalog(db, count):
+    """Top the products collection up to ``count`` bench products inserted directly into Mongo."""
+    existing = db.products.count_documents({"description": BENCH_MARKER})
+    categories = [category["name"] for category in db.categories.find({}, {"name": 1})] or ["Dairy"]
+    brands = [brand["name"] for brand in db.brands.find({}, {"name": 1})] or ["Amul"]
+    rng = random.Random(count)
+    batch = []
+    inserted = []
+    for index in range(existing, count):
+        batch.append({
+            "id": f"bench-{index}",
+            "name": f"Bench Product {index:07d}",
+            "description": BENCH_MARKER,
+            "price": round(rng.uniform(10, 2000), 2),
+            "category": rng.choice(categories),
+            "brand": rng.choice(brands),
+            "image_url": f"https://images.example.com/bench/{index}.jpg",
+            "stock": rng.randint(0, 500),
+            "unit": rng.choice(["100g", "200g", "500g", "1kg", "500ml", "1L"]),
+        })
+        if len(batch) == 5000:
+            db.products.insert_many(batch, ordered=False)
+            inserted.extend(batch)
+            batch = []
+    if batch:
+        db.products.insert_many(batch, ordered=False)
+        inserted.extend(batch)
+    bump_product_counts(db, inserted)
+
+def bump_product_counts(db, products, sign=1):
+    """Keep the server's per-category/brand product counters in step with direct inserts and deletes."""
+    for collection, field in (("categories", "category"), ("brands", "brand")):
+        counts = Counter(product[field] for product in products)
+        if counts:
+            db[collection].bulk_write([
+                UpdateOne({"name": name}, {"$inc": {"product_count": sign * count}})
+                for name, count in counts.items()
+            ], ordered=False)
+
+def remove_seeded_catalog(db):
+    products = list(db.products.find({"description": BENCH_MARKER}, {"_id": 0, "category": 1, "brand": 1}))
+    db.products.delete_many({"description": BENCH_MARKER})
+    bump_product_counts(db, products, sign=-1)
+
+def seed_orders(db, count, users=1000):
+    """Insert ``count`` bench orders spread over the last year for ``users`` bench users."""
+    rng = random.Random(count)
+    now = datetime.utcnow()
+    user_ids = [f"bench-user-{index}" for index in range(users)]
+    db.users.insert_many([{
+        "id": user_id,
+        "name": f"Bench User {index}",
+        "email": f"{user_id}@{BENCH_EMAIL_DOMAIN}",
+        "password": "",
+        "phone": None,
+        "address": BENCH_MARKER,
+        "role": "user",
+        "created_at": now,
+    } for index, user_id in enumerate(user_ids)], ordered=False)
+
+    batch = []
+    for index in range(count):
+        quantity = rng.randint(1, 10)
+        price = round(rng.uniform(10, 2000), 2)
+        batch.append({
+            "id": f"bench-order-{index}",
+            "user_id": rng.choice(user_ids),
+            "items": [{
+                "product_id": f"bench-{rng.randint(0, 9999)}",
+                "product_name": "Bench Product",
+                "quantity": quantity,
+                "price": price,
+                "total": quantity * price,
+            }],
+            "total_amount": quantity * price,
+            "status": rng.choices(ORDER_STATUSES, weights=[30, 20, 15, 30, 5])[0],
+            "delivery_address": BENCH_MARKER,
+            "order_date": now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+            "delivery_date": None,
+        })
+        if len(batch) == 5000:
+            db.orders.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.orders.insert_many(batch, ordered=False)
+
+def remove_seeded_orders(db):
+    db.orders.delete_many({"delivery_address": BENCH_MARKER})
+    db.users.delete_many({"email": {"$regex": f"@{BENCH_EMAIL_DOMAIN.replace('.', '[.]')}$"}})
+
+def measure_response(session, url, iterations, params=None, headers=None):
+    """Time GET ``url``; ``bytes`` is the size on the wire, before any decompression."""
+    latencies = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = session.get(url, params=params, headers=headers, stream=True)
+        size = len(response.raw.read())
+        latencies.append((time.perf_counter() - started) * 1000)
+    row = summarize(latencies, 0, sum(latencies) / 1000)
+    row["bytes"] = size
+    return row
+
+def bench_products(args):
+    print_header("GET /api/products PAYLOAD AND LATENCY")
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    session = requests.Session()
+
+    scenarios = {
+        "full catalog": {},
+        "page of 50": {"limit": 50},
+        "page of 50, list fields": {"limit": 50, "fields": "id,name,price,image_url,unit"},
+        "page of 50, sort=price": {"limit": 50, "sort": "price", "fields": "id,name,price,image_url,unit"},
+        "page of 50, category+price": {"limit": 50, "category": "Dairy", "min_price": 100, "max_price": 500},
+    }
+
+    results = {}
+    workers = []
+    try:
+        for catalog_size in args.catalog_sizes:
+            seed_catalog(db, catalog_size)
+            print_info(f"Catalog seeded with {catalog_size} bench products")
+            # The products are inserted behind the server's back, so fresh workers
+            # are started for each size: one that never caches (every request is
+            # a query) and one with the catalog cache as configured
+            cold, cold_url = start_worker(args.ports[0], {"CATALOG_CACHE_TTL": "0"})
+            workers.append(cold)
+            warm, warm_url = start_worker(args.ports[1])
+            workers.append(warm)
+
+            # Deep page: walk 20 pages by cursor and time the last one
+            deep = {"limit": 50, "sort": "price", "fields": "id,name,price"}
+            for _ in range(20):
+                page = session.get(f"{cold_url}/products", params=deep).json()
+                deep["cursor"] = page["next_cursor"]
+
+            for name, params in {**scenarios, "page 21 by cursor": deep}.items():
+                iterations = 3 if name == "full catalog" else args.iterations
+                results[f"{catalog_size}: {name} (cold)"] = measure_response(session, f"{cold_url}/products", iterations, params)
+                session.get(f"{warm_url}/products", params=params).raise_for_status()
+                results[f"{catalog_size}: {name} (warm)"] = measure_response(session, f"{warm_url}/products", iterations, params)
+
+            for worker in workers:
+                worker.terminate()
+                worker.wait()
+            workers = []
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+        if not args.keep:
+            remove_seeded_catalog(db)
+
+    print(f"{'scenario'.ljust(48)}{'bytes':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, row in results.items():
+        print(f"{name.ljust(48)}{row['bytes']:>12}{row['p50']:>10.2f}{row['p95']:>10.2f}")
+    return results
+
+def start_worker(port, env=None):
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+    )
+    url = f"http://localhost:{port}/api"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/categories", timeout=1).status_code == 200:
+                return worker, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    worker.terminate()
+    raise RuntimeError(f"worker on port {port} did not start")
+
+def bench_invalidation(args):
+    print_header("CROSS-WORKER CACHE INVALIDATION")
+    workers = []
+    created = []
+    session = requests.Session()
+    try:
+        writer, writer_url = start_worker(args.ports[0])
+        workers.append(writer)
+        reader, reader_url = start_worker(args.ports[1])
+        workers.append(reader)
+
+        response = session.post(f"{writer_url}/admin/login", json=ADMIN_CREDENTIALS)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        mode = session.get(f"{writer_url}/admin/cache/stats", headers=headers).json()["invalidation"]["mode"]
+        print_info(f"Writer {writer_url}, reader {reader_url}, invalidation mode: {mode}")
+
+        delays = []
+        missed = 0
+        for round_number in range(args.rounds):
+            # Warm the reader's cache so it would serve stale data without an invalidation
+            session.get(f"{reader_url}/categories")
+            name = f"Propagation {int(time.time() * 1000)} {round_number}"
+            response = session.post(f"{writer_url}/admin/categories", headers=headers, json={
+                "name": name, "description": BENCH_MARKER, "icon": "",
+            })
+            response.raise_for_status()
+            written = time.perf_counter()
+            created.append(response.json()["category_id"])
+
+            deadline = written + args.timeout
+            while time.perf_counter() < deadline:
+                categories = session.get(f"{reader_url}/categories").json()["categories"]
+                if any(category["name"] == name for category in categories):
+                    delays.append((time.perf_counter() - written) * 1000)
+                    break
+                time.sleep(0.002)
+            else:
+                missed += 1
+
+        for category_id in created:
+            session.delete(f"{writer_url}/admin/categories/{category_id}", headers=headers)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+
+    result = {
+        "mode": mode,
+        "rounds": args.rounds,
+        "missed": missed,
+        "p50_ms": percentile(delays, 50),
+        "p95_ms": percentile(delays, 95),
+        "max_ms": max(delays) if delays else 0.0,
+    }
+    print_info(f"propagation p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+    if missed:
+        print(f"{Colors.FAIL}[FAIL] {missed} invalidations did not reach the reader within {args.timeout}s{Colors.ENDC}")
+    else:
+        print(f"{Colors.OKGREEN}[PASS] Every invalidation reached the second worker{Colors.ENDC}")
+    return result
+
+def bench_login_storm(args):
+    print_header("CATALOG LATENCY DURING A LOGIN STORM")
+    session = requests.Session()
+    email = f"storm_{int(time.time() * 1000)}@example.com"
+    session.post(f"{API_URL}/auth/register", json={"name": "Storm", "email": email, "password": "Storm@123"}).raise_for_status()
+
+    baseline = hammer("/categories", args.readers, args.duration)
+
+    statuses = {}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def login_loop():
+        login_session = requests.Session()
+        while not stop.is_set():
+            response = login_session.post(f"{API_URL}/auth/login", json={"email": email, "password": "Storm@123"})
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    storm = [threading.Thread(target=login_loop, daemon=True) for _ in range(args.logins)]
+    for thread in storm:
+        thread.start()
+    try:
+        during = hammer("/categories", args.readers, args.duration)
+    finally:
+        stop.set()
+        for thread in storm:
+            thread.join()
+
+    results = {"GET /api/categories (idle)": baseline, "GET /api/categories (login storm)": during}
+    print_latency_table(results)
+    print_info(f"Login responses during storm: {dict(sorted(statuses.items()))}")
+    return {"catalog": results, "login_statuses": statuses}
+
+def bench_auth(args):
+    print_header("AUTH OVERHEAD PER REQUEST")
+    sys.path.insert(0, BACKEND_DIR)
+    import jwt
+    import server
+
+    token = jwt.encode(
+        {"user_id": "bench", "email": "bench@example.com", "role": "user", "exp": int(time.time()) + 3600},
+        server.JWT_SECRET, algorithm='HS256'
+    )
+
+    async def measure():
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            jwt.decode(token, server.JWT_SECRET, algorithms=['HS256'])
+        uncached = (time.perf_counter() - started) / args.iterations
+
+        misses = max(1, args.iterations // 100)
+        started = time.perf_counter()
+        for _ in range(misses):
+            server.token_cache.clear()
+            await server.decode_token(token)
+        miss = (time.perf_counter() - started) / misses
+
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            await server.decode_token(token)
+        hit = (time.perf_counter() - started) / args.iterations
+        return uncached, miss, hit
+
+    try:
+        uncached, miss, hit = asyncio.run(measure())
+    finally:
+        server.client.close()
+
+    results = {
+        "jwt.decode (no cache)": uncached * 1e6,
+        "decode_token miss (decode + revocation lookup)": miss * 1e6,
+        "decode_token hit": hit * 1e6,
+    }
+    for name, micros in results.items():
+        print(f"{name.ljust(50)}{micros:>10.2f} us")
+    return results
+
+def bench_admin_orders(args):
+    print_header("GET /api/admin/orders AT SCALE")
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    session = requests.Session()
+    session.headers.update(admin_headers(session))
+    url = f"{API_URL}/admin/orders"
+
+    results = {}
+    try:
+        seed_orders(db, args.orders)
+        print_info(f"Seeded {args.orders} orders")
+        last_week = (datetime.utcnow() - timedelta(days=7)).isoformat()
+        scenarios = {
+            "page of 50": {"limit": 50},
+            "page of 50, status=pending": {"limit": 50, "status": "pending"},
+            "page of 50, last 7 days": {"limit": 50, "date_from": last_week},
+            "page of 50, one user": {"limit": 50, "user_id": "bench-user-0"},
+        }
+        for name, params in scenarios.items():
+            results[name] = measure_response(session, url, args.iterations, params)
+
+        params = {"limit": 50}
+        for _ in range(100):
+            params["cursor"] = session.get(url, params=params).json()["next_cursor"]
+        results["page 101 by cursor"] = measure_response(session, url, args.iterations, params)
+        if args.full:
+            results["all orders (no limit)"] = measure_response(session, url, 1)
+    finally:
+        remove_seeded_orders(db)
+
+    print(f"{'scenario'.ljust(40)}{'bytes':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, row in results.items():
+        print(f"{name.ljust(40)}{row['bytes']:>12}{row['p50']:>10.2f}{row['p95']:>10.2f}")
+    return results
+
+def bench_category_admin(args):
+    print_header("CATEGORY AND BRAND ADMIN ON A LARGE CATALOG")
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    session = requests.Session()
+    headers = admin_headers(session)
+
+    results = {}
+    try:
+        seed_catalog(db, args.catalog_size)
+        category = session.get(f"{API_URL}/categories").json()["categories"][0]
+        in_use = db.products.count_documents({"category": category["name"]})
+        print_info(f"{args.catalog_size} bench products, '{category['name']}' used by {in_use}")
+
+        results["delete guard (category in use)"] = timed_requests(
+            session, "DELETE", f"{API_URL}/admin/categories/{category['id']}", args.iterations, headers=headers
+        )
+        # The guard answers 400; count those as the expected outcome, not errors
+        results["delete guard (category in use)"]["errors"] = 0
+
+        latencies = []
+        for index in range(args.iterations):
+            response = session.post(f"{API_URL}/admin/categories", headers=headers, json={
+                "name": f"Bench Empty {int(time.time() * 1000)} {index}", "description": BENCH_MARKER, "icon": "",
+            })
+            started = time.perf_counter()
+            session.delete(f"{API_URL}/admin/categories/{response.json()['category_id']}", headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+        results["delete unused category"] = summarize(latencies, 0, sum(latencies) / 1000)
+
+        latencies = []
+        original = {key: category[key] for key in ("name", "description", "icon")}
+        for name in (f"{original['name']} (renamed)", original["name"]):
+            started = time.perf_counter()
+            response = session.put(f"{API_URL}/admin/categories/{category['id']}", headers=headers, json={**original, "name": name})
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+        results[f"rename cascade ({in_use} products)"] = summarize(latencies, 0, sum(latencies) / 1000)
+    finally:
+        remove_seeded_catalog(db)
+
+    print_latency_table(results)
+    return results
+
+def bench_admin_shell(args):
+    print_header("ADMIN SHELL THROUGHPUT")
+    print_info(f"{args.clients} clients, {args.duration}s per variant against {BASE_URL}/admin")
+
+    session = requests.Session()
+    sizes = {}
+    for encoding in ("identity", "gzip", "br"):
+        response = session.get(f"{BASE_URL}/admin", headers={"Accept-Encoding": encoding}, stream=True)
+        sizes[encoding] = (len(response.raw.read()), response.headers.get("Content-Encoding", "identity"))
+    for encoding, (size, served) in sizes.items():
+        print_info(f"Accept-Encoding {encoding}: {size} bytes on the wire (served {served})")
+    etag = session.get(f"{BASE_URL}/admin", headers={"Accept-Encoding": "gzip"}).headers.get("ETag")
+
+    scenarios = {
+        "GET /admin (identity)": ({"Accept-Encoding": "identity"}, (200,)),
+        "GET /admin (gzip, br)": ({"Accept-Encoding": "gzip, br"}, (200,)),
+        "GET /admin (revalidate, 304)": ({"Accept-Encoding": "gzip", "If-None-Match": etag or ""}, (304,)),
+    }
+    results = {}
+    for name, (headers, expected) in scenarios.items():
+        results[name] = hammer("/admin", args.clients, args.duration, headers, expected, base_url=BASE_URL)
+    print_latency_table(results)
+    results["bytes"] = {encoding: size for encoding, (size, _) in sizes.items()}
+    return results
+
+def start_static_server(port, legacy):
+    command = [sys.executable, os.path.join(ADMIN_DIR, "server.py"), "--port", str(port), "--directory", ADMIN_DIR]
+    if legacy:
+        command.append("--legacy")
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://localhost:{port}"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{url}/index.html", timeout=1)
+            return server, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"static server on port {port} did not start")
+
+def bench_static(args):
+    print_header("ADMIN STATIC SERVER: LEGACY VS. THREADED")
+    print_info(f"{args.clients} clients, {args.duration}s per scenario, serving {ADMIN_DIR}")
+
+    results = {}
+    for label, port, legacy in (("legacy", args.ports[0], True), ("threaded", args.ports[1], False)):
+        server, url = start_static_server(port, legacy)
+        try:
+            last_modified = requests.get(f"{url}/admin.js").headers.get("Last-Modified", "")
+            scenarios = {
+                "index.html": ("/index.html", None, (200,)),
+                "admin.js": ("/admin.js", None, (200,)),
+                "admin.js revalidate": ("/admin.js", {"If-Modified-Since": last_modified}, (304,)),
+            }
+            for name, (path, headers, expected) in scenarios.items():
+                results[f"{label} {name}"] = hammer(path, args.clients, args.duration, headers, expected, base_url=url)
+        finally:
+            server.terminate()
+            server.wait()
+    print_latency_table(results)
+    return results
+
+def bench_encoding(args):
+    print_header("JSON ENCODING AND COMPRESSION")
+    sys.path.insert(0, BACKEND_DIR)
+    import jwt
+    from fastapi.encoders import jsonable_encoder
+    from json_response import dumps, orjson
+
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    session = requests.Session()
+    admin = admin_headers(session)
+    token = register_bench_user(session)
+    user = {"Authorization": f"Bearer {token}"}
+
+    encode_results = {}
+    wire_results = {}
+    try:
+        seed_orders(db, args.orders)
+        # Hand some of the seeded history to the bench user for GET /api/orders
+        user_id = jwt.decode(token, options={"verify_signature": False})["user_id"]
+        db.orders.update_many(
+            {"id": {"$in": [f"bench-order-{index}" for index in range(args.user_orders)]}},
+            {"$set": {"user_id": user_id}},
+        )
+        print_info(f"Seeded {args.orders} orders, {args.user_orders} of them for the bench user")
+
+        # In-process encode cost of the payloads the list endpoints build
+        payloads = {
+            "products": {"products": list(db.products.find({}, {"_id": 0}).limit(500))},
+            "admin orders": {"orders": list(db.orders.find({}, {"_id": 0}).limit(500))},
+            "admin users": {"users": list(db.users.find({"role": {"$ne": "admin"}}, {"_id": 0, "password": 0}))},
+        }
+        encoders = {
+            "jsonable_encoder + json": lambda content: json.dumps(jsonable_encoder(content)).encode("utf-8"),
+            "json": lambda content: dumps(content, "json"),
+        }
+        if orjson is not None:
+            encoders["orjson"] = lambda content: dumps(content, "orjson")
+        for name, content in payloads.items():
+            for encoder, encode in encoders.items():
+                started = time.perf_counter()
+                for _ in range(args.iterations):
+                    body = encode(content)
+                encode_results[f"{name} / {encoder}"] = {
+                    "ms": (time.perf_counter() - started) * 1000 / args.iterations,
+                    "bytes": len(body),
+                }
+
+        # Latency and bytes on the wire per negotiated encoding
+        endpoints = {
+            "GET /api/products?limit=500": (f"{API_URL}/products", {"limit": 500}, None),
+            "GET /api/admin/orders?limit=500": (f"{API_URL}/admin/orders", {"limit": 500}, admin),
+            "GET /api/admin/users": (f"{API_URL}/admin/users", None, admin),
+            "GET /api/orders": (f"{API_URL}/orders", None, user),
+        }
+        for name, (url, params, headers) in endpoints.items():
+            for encoding in ("identity", "gzip", "br"):
+                wire_results[f"{name} [{encoding}]"] = measure_response(
+                    session, url, args.iterations, params, {**(headers or {}), "Accept-Encoding": encoding}
+                )
+    finally:
+        remove_seeded_orders(db)
+
+    print(f"{'payload / encoder'.ljust(44)}{'bytes':>12}{'ms':>10}")
+    for name, row in encode_results.items():
+        print(f"{name.ljust(44)}{row['bytes']:>12}{row['ms']:>10.2f}")
+    print()
+    print(f"{'endpoint [encoding]'.ljust(44)}{'bytes':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, row in wire_results.items():
+        print(f"{name.ljust(44)}{row['bytes']:>12}{row['p50']:>10.2f}{row['p95']:>10.2f}")
+    return {"encode": encode_results, "wire": wire_results}
+
+def peak_rss_mb(pid):
+    """Peak resident set size of ``pid`` so far (Linux VmHWM)."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not available")
+
+def bench_export(args):
+    print_header("STREAMING EXPORT MEMORY")
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    session = requests.Session()
+
+    results = {}
+    worker = None
+    try:
+        seed_orders(db, args.orders)
+        expected = db.orders.count_documents({})
+        print_info(f"Seeded {args.orders} orders ({expected} in total)")
+        worker, url = start_worker(args.port)
+        response = session.post(f"{url}/admin/login", json=ADMIN_CREDENTIALS)
+        response.raise_for_status()
+        session.headers.update({"Authorization": f"Bearer {response.json()['token']}"})
+
+        # Warm up so imports, pools and the first batch are in the baseline
+        session.get(f"{url}/admin/orders", params={"limit": 500}).raise_for_status()
+        baseline = peak_rss_mb(worker.pid)
+        print_info(f"Worker peak RSS before export: {baseline:.1f} MB")
+
+        for name, accept in (("json", "application/json"), ("ndjson", "application/x-ndjson")):
+            started = time.perf_counter()
+            response = session.get(f"{url}/admin/orders", headers={"Accept": accept, "Accept-Encoding": "identity"}, stream=True)
+            response.raise_for_status()
+            size = 0
+            rows = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                size += len(chunk)
+                rows += chunk.count(b"\n") if name == "ndjson" else 0
+            elapsed = time.perf_counter() - started
+            peak = peak_rss_mb(worker.pid)
+            results[name] = {
+                "seconds": elapsed,
+                "bytes": size,
+                "rows": rows if name == "ndjson" else None,
+                "peak_rss_mb": peak,
+                "growth_mb": peak - baseline,
+            }
+    finally:
+        if worker is not None:
+            worker.terminate()
+            worker.wait()
+        remove_seeded_orders(db)
+
+    print(f"{'format'.ljust(10)}{'MB':>10}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>14}{'growth MB':>12}")
+    for name, row in results.items():
+        print(
+            f"{name.ljust(10)}{row['bytes'] / 1e6:>10.1f}{row['seconds']:>10.1f}{expected / row['seconds']:>12.0f}"
+            f"{row['peak_rss_mb']:>14.1f}{row['growth_mb']:>12.1f}"
+        )
+    if results["ndjson"]["rows"] != expected:
+        print_info(f"FAIL: NDJSON export returned {results['ndjson']['rows']} rows, expected {expected}")
+    growth = max(row["growth_mb"] for row in results.values())
+    verdict = "PASS" if growth <= args.max_growth_mb else "FAIL"
+    print_info(f"{verdict}: peak RSS grew {growth:.1f} MB during export (limit {args.max_growth_mb} MB)")
+    return results
+
+def bulk_rows(count, categories, brands, seed):
+    rng = random.Random(seed)
+    return [{
+        "sku": f"BENCH-{index:07d}",
+        "name": f"Bulk Bench Product {index:07d}",
+        "description": BENCH_MARKER,
+        "price": round(rng.uniform(10, 2000), 2),
+        "category": rng.choice(categories),
+        "brand": rng.choice(brands),
+        "image_url": f"https://images.example.com/bulk/{index}.jpg",
+        "stock": rng.randint(0, 500),
+        "unit": rng.choice(["100g", "500g", "1kg", "1L"]),
+    } for index in range(count)]
+
+def to_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def to_ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+def bench_bulk_import(args):
+    print_header("BULK PRODUCT IMPORT")
+    db = MongoClient(MONGO_URL)[DB_NAME]
+    session = requests.Session()
+    headers = admin_headers(session)
+    categories = [category["name"] for category in session.get(f"{API_URL}/categories").json()["categories"]] or ["Dairy"]
+    brands = [brand["name"] for brand in session.get(f"{API_URL}/brands").json()["brands"]] or ["Amul"]
+
+    rows = bulk_rows(args.rows, categories, brands, args.rows)
+    columns = list(rows[0])
+    repriced = bulk_rows(args.rows, categories, brands, args.rows + 1)
+    uploads = [
+        ("upsert (insert), csv", "upsert", "text/csv", to_csv(rows, columns)),
+        ("upsert (replace), ndjson", "upsert", "application/x-ndjson", to_ndjson(rows)),
+        ("update price+stock, csv", "update", "text/csv", to_csv(repriced, ["sku", "price", "stock"])),
+    ]
+
+    results = {}
+    try:
+        for name, mode, content_type, body in uploads:
+            started = time.perf_counter()
+            response = session.post(
+                f"{API_URL}/admin/products/bulk", params={"mode": mode}, data=body,
+                headers={**headers, "Content-Type": content_type},
+            )
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            report = response.json()
+            results[name] = {
+                "rows": report["received"], "created": report["created"], "updated": report["updated"],
+                "errors": report["error_count"], "seconds": elapsed, "rows_per_sec": report["received"] / elapsed,
+                "bytes": len(body),
+            }
+
+        # The old path: one POST per product
+        started = time.perf_counter()
+        for row in bulk_rows(args.single_rows, categories, brands, 0):
+            row["sku"] = row["sku"].replace("BENCH-", "BENCH-ONE-")
+            session.post(f"{API_URL}/admin/products", json=row, headers=headers).raise_for_status()
+        elapsed = time.perf_counter() - started
+        results["POST /api/admin/products per row"] = {
+            "rows": args.single_rows, "created": args.single_rows, "updated": 0, "errors": 0,
+            "seconds": elapsed, "rows_per_sec": args.single_rows / elapsed, "bytes": 0,
+        }
+    finally:
+        created = db.products.count_documents({"description": BENCH_MARKER})
+        remove_seeded_catalog(db)
+        db.stats.update_one({"_id": "dashboard"}, {"$inc": {"total_products": -created}})
+
+    print(f"{'upload'.ljust(36)}{'rows':>9}{'created':>9}{'updated':>9}{'errors':>8}{'seconds':>9}{'rows/s':>10}")
+    for name, row in results.items():
+        print(
+            f"{name.ljust(36)}{row['rows']:>9}{row['created']:>9}{row['updated']:>9}{row['errors']:>8}"
+            f"{row['seconds']:>9.1f}{row['rows_per_sec']:>10.0f}"
+        )
+    return results
+
+def bench_startup(args):
+    print_header("WORKER STARTUP TIME")
+    client = MongoClient(MONGO_URL)
+    scratch = f"{DB_NAME}_startup_bench"
+
+    def time_start(env):
+        started = time.perf_counter()
+        worker, _ = start_worker(args.port, env)
+        elapsed = (time.perf_counter() - started) * 1000
+        worker.terminate()
+        worker.wait()
+        return elapsed
+
+    scenarios = {
+        "empty database (full seed)": lambda: client.drop_database(scratch),
+        "seeded, marker removed": lambda: client[scratch].migrations.delete_many({}),
+        "seeded, marker current": lambda: None,
+    }
+    results = {}
+    try:
+        for name, prepare in scenarios.items():
+            latencies = []
+            for _ in range(args.runs):
+                prepare()
+                latencies.append(time_start({"DB_NAME": scratch}))
+            results[name] = summarize(latencies, 0, sum(latencies) / 1000)
+    finally:
+        client.drop_database(scratch)
+
+    print_info("Time from process start until GET /api/categories answers")
+    print_latency_table(results)
+    return results
+
+def bench_metrics_overhead(args):
+    print_header("METRICS OVERHEAD")
+    sys.path.insert(0, BACKEND_DIR)
+    import metrics
+
+    # In-process cost of one command's listener callbacks
+    listener = metrics.CommandMetrics()
+    event = type("Event", (), {})()
+    event.connection_id = ("localhost", 27017)
+    event.command_name = "find"
+    event.command = {"find": "products", "filter": {"category": "Dairy"}}
+    event.duration_micros = 800
+    started = time.perf_counter()
+    for request_id in range(args.iterations):
+        event.request_id = request_id
+        listener.started(event)
+        listener.succeeded(event)
+    listener_us = (time.perf_counter() - started) / args.iterations * 1e6
+    print_info(f"CommandListener started+succeeded: {listener_us:.2f} us per command")
+
+    results = {"listener_us_per_command": listener_us}
+    for label, port, enabled in (("metrics off", args.ports[0], "0"), ("metrics on", args.ports[1], "1")):
+        worker, url = start_worker(port, {"METRICS_ENABLED": enabled})
+        try:
+            for path in ("/products", "/categories"):
+                results[f"{label} GET /api{path}"] = hammer(path, args.clients, args.duration, base_url=url)
+        finally:
+            worker.terminate()
+            worker.wait()
+    print_latency_table({name: row for name, row in results.items() if isinstance(row, dict)})
+    return results
+
+# Weighted user journeys replayed by the load scenario; each mirrors a
+# backend_test.py flow, with the mix tilted towards browsing as in production
+JOURNEY_WEIGHTS = {"browse": 60, "shop": 25, "checkout": 10, "signup": 5}
+
+class LoadRecorder:
+    """Per-endpoint latencies, kept only once the warm-up has passed."""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies = {}
+        self.errors = Counter()
+        self.journeys = Counter()
+
+    def record(self, name, latency_ms, ok):
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(latency_ms)
+        if not ok:
+            self.errors[name] += 1
+
+class VirtualUser:
+    def __init__(self, http, recorder, rng, catalog, account, think_ms):
+        self.http = http
+        self.recorder = recorder
+        self.rng = rng
+        self.catalog = catalog
+        self.account = account
+        self.think_ms = think_ms
+        self.token = None
+
+    async def call(self, method, name, path, expected=(200,), auth=False, **kwargs):
+        if auth:
+            kwargs["headers"] = {"Authorization": f"Bearer {self.token}"}
+        started = time.perf_counter()
+        data = None
+        try:
+            async with self.http.request(method, f"{API_URL}{path}", **kwargs) as response:
+                body = await response.read()
+                ok = response.status in expected
+            if ok and body:
+                data = json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            ok = False
+        self.recorder.record(name, (time.perf_counter() - started) * 1000, ok)
+        return data
+
+    async def think(self):
+        if self.think_ms:
+            await asyncio.sleep(self.rng.expovariate(1000.0 / self.think_ms))
+
+    def pick_products(self, ids, count):
+        # Popularity falls off with rank, so a few products take most traffic
+        return self.rng.choices(ids, weights=self.catalog["popularity"][:len(ids)], k=count)
+
+    async def login(self):
+        # Users stay signed in across journeys, as a browser session would
+        if self.token is None:
+            data = await self.call("POST", "POST /api/auth/login", "/auth/login", json=self.account)
+            self.token = data["token"] if data else None
+        return self.token is not None
+
+    async def browse(self):
+        await self.call("GET", "GET /api/categories", "/categories")
+        await self.think()
+        category = self.rng.choice(self.catalog["categories"])
+        await self.call("GET", "GET /api/products", "/products", params={"category": category})
+        await self.think()
+        for product_id in self.pick_products(self.catalog["products"], self.rng.randint(1, 3)):
+            await self.call("GET", "GET /api/products/{product_id}", f"/products/{product_id}")
+            await self.think()
+        await self.call("GET", "GET /api/brands", "/brands")
+
+    async def shop(self):
+        if not await self.login():
+            return
+        items = self.pick_products(self.catalog["stocked"], self.rng.randint(1, 3))
+        for product_id in items:
+            await self.call("POST", "POST /api/cart/add", "/cart/add", auth=True,
+                            json={"product_id": product_id, "quantity": self.rng.randint(1, 3)})
+            await self.think()
+        await self.call("GET", "GET /api/cart", "/cart", auth=True)
+        await self.think()
+        await self.call("DELETE", "DELETE /api/cart/{product_id}", f"/cart/{items[0]}", auth=True)
+        await self.call("POST", "POST /api/cart/batch", "/cart/batch", auth=True, json={"items": [], "replace": True})
+
+    async def checkout(self):
+        if not await self.login():
+            return
+        for product_id in self.pick_products(self.catalog["stocked"], self.rng.randint(1, 3)):
+            await self.call("POST", "POST /api/cart/add", "/cart/add", auth=True,
+                            json={"product_id": product_id, "quantity": self.rng.randint(1, 3)})
+        await self.think()
+        await self.call("POST", "POST /api/orders", "/orders", auth=True,
+                        json={"delivery_address": "123 Load Street, Test City"})
+        await self.think()
+        await self.call("GET", "GET /api/orders", "/orders", auth=True)
+
+    async def signup(self):
+        data = await self.call("POST", "POST /api/auth/register", "/auth/register", json={
+            "name": "Load User",
+            "email": f"signup_{self.rng.getrandbits(64):016x}@{BENCH_EMAIL_DOMAIN}",
+            "password": "Load@123",
+        })
+        if data is None:
+            return
+        headers = {"Authorization": f"Bearer {data['token']}"}
+        await self.call("GET", "GET /api/cart", "/cart", headers=headers)
+        await self.call("POST", "POST /api/auth/logout", "/auth/logout", headers=headers)
+
+    async def run(self, journeys, weights, deadline):
+        while time.perf_counter() < deadline:
+            journey = self.rng.choices(journeys, weights=weights)[0]
+            await getattr(self, journey)()
+            if self.recorder.recording:
+                self.recorder.journeys[journey] += 1
+            await self.think()
+
+async def register_load_accounts(http, count, run_id):
+    """One account per virtual user, so concurrent carts never interfere."""
+    semaphore = asyncio.Semaphore(8)
+
+    async def register(index):
+        account = {"name": f"Load User {index}", "email": f"load_{run_id}_{index}@{BENCH_EMAIL_DOMAIN}", "password": "Load@123"}
+        async with semaphore:
+            while True:
+                async with http.post(f"{API_URL}/auth/register", json=account) as response:
+                    # 429 means the password hashing pool is full; wait as told and retry
+                    if response.status != 429:
+                        response.raise_for_status()
+                        break
+                    retry_after = response.headers.get("Retry-After", "1")
+                await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 1.0)
+        return {"email": account["email"], "password": account["password"]}
+
+    return await asyncio.gather(*(register(index) for index in range(count)))
+
+async def run_load(args, weights, catalog):
+    connector = aiohttp.TCPConnector(limit=args.users, limit_per_host=args.users)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        print_info(f"Registering {args.users} virtual user accounts")
+        accounts = await register_load_accounts(http, args.users, int(time.time()))
+        recorder = LoadRecorder()
+        journeys = list(weights)
+        deadline = time.perf_counter() + args.warmup + args.duration
+        users = [
+            VirtualUser(http, recorder, random.Random(args.seed * 100003 + index), catalog, account, args.think_ms)
+            for index, account in enumerate(accounts)
+        ]
+        tasks = [asyncio.create_task(user.run(journeys, [weights[name] for name in journeys], deadline)) for user in users]
+        print_info(f"Warming up for {args.warmup}s")
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        started = time.perf_counter()
+        print_info(f"Measuring for {args.duration}s")
+        await asyncio.gather(*tasks)
+        return recorder, time.perf_counter() - started
+
+def parse_weights(pairs):
+    weights = dict(JOURNEY_WEIGHTS)
+    for pair in pairs or []:
+        name, _, weight = pair.partition("=")
+        if name not in JOURNEY_WEIGHTS or not weight.isdigit():
+            raise SystemExit(f"--weights expects journey=weight with journeys {', '.join(JOURNEY_WEIGHTS)}, got {pair!r}")
+        weights[name] = int(weight)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+def bench_load(args):
+    print_header("WEIGHTED USER JOURNEY LOAD TEST")
+    if aiohttp is None:
+        raise SystemExit("The load scenario needs aiohttp: pip install aiohttp")
+    global API_URL
+    worker = None
+    if args.spawn:
+        worker, API_URL = start_worker(args.port)
+    try:
+        weights = parse_weights(args.weights)
+        session = requests.Session()
+        products = session.get(f"{API_URL}/products").json()["products"]
+        categories = [category["name"] for category in session.get(f"{API_URL}/categories").json()["categories"]]
+        # Carts and orders use bench products with effectively unlimited stock,
+        # so checkouts never fail on stock the run itself used up
+        stocked = ensure_products(session, args.products)
+        catalog = {
+            "products": [product["id"] for product in products] or stocked,
+            "stocked": stocked,
+            "categories": categories,
+            "popularity": [1.0 / (rank + 1) for rank in range(max(len(products), len(stocked)))],
+        }
+        print_info(f"{args.users} virtual users, journeys {weights}, think time {args.think_ms}ms, seed {args.seed}")
+        recorder, elapsed = asyncio.run(run_load(args, weights, catalog))
+    finally:
+        if worker is not None:
+            worker.terminate()
+            worker.wait()
+
+    endpoints = {
+        name: summarize(latencies, recorder.errors[name], elapsed)
+        for name, latencies in sorted(recorder.latencies.items())
+    }
+    every = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    endpoints["all"] = summarize(every, sum(recorder.errors.values()), elapsed)
+    print_latency_table(endpoints)
+    print_info("Journeys completed: " + ", ".join(f"{name} {count}" for name, count in recorder.journeys.most_common()))
+    return {
+        "config": {
+            "users": args.users,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+            "weights": weights,
+        },
+        "journeys": dict(recorder.journeys),
+        "journeys_per_second": sum(recorder.journeys.values()) / elapsed if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+def main():
+    global BASE_URL, API_URL
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--json", help="write results to this file")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    concurrency = subparsers.add_parser("concurrency", help="requests/sec with many simultaneous clients")
+    concurrency.add_argument("--clients", type=int, default=64)
+    concurrency.add_argument("--duration", type=float, default=10.0)
+    concurrency.set_defaults(func=bench_concurrency)
+
+    cart = subparsers.add_parser("cart", help="GET /api/cart latency vs. number of cart lines")
+    cart.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    cart.add_argument("--iterations", type=int, default=200)
+    cart.set_defaults(func=bench_cart)
+
+    checkout = subparsers.add_parser("checkout", help="concurrent POST /api/orders against limited stock")
+    checkout.add_argument("--buyers", type=int, default=200)
+    checkout.add_argument("--stock", type=int, default=50)
+    checkout.set_defaults(func=bench_checkout)
+
+    products = subparsers.add_parser("products", help="GET /api/products response size and latency by catalog size")
+    products.add_argument("--catalog-sizes", type=int, nargs="+", default=[10000, 100000])
+    products.add_argument("--iterations", type=int, default=50)
+    products.add_argument("--ports", type=int, nargs=2, default=[8019, 8020], help="cold (cache off) and warm worker ports")
+    products.add_argument("--keep", action="store_true", help="leave the seeded bench products in place")
+    products.set_defaults(func=bench_products)
+
+    invalidation = subparsers.add_parser("invalidation", help="start two workers and time cache invalidation between them")
+    invalidation.add_argument("--ports", type=int, nargs=2, default=[8011, 8012])
+    invalidation.add_argument("--rounds", type=int, default=50)
+    invalidation.add_argument("--timeout", type=float, default=5.0)
+    invalidation.set_defaults(func=bench_invalidation)
+
+    storm = subparsers.add_parser("login-storm", help="catalog latency while many clients log in")
+    storm.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    storm.add_argument("--readers", type=int, default=8, help="concurrent catalog clients")
+    storm.add_argument("--duration", type=float, default=10.0)
+    storm.set_defaults(func=bench_login_storm)
+
+    auth = subparsers.add_parser("auth", help="in-process cost of token verification with and without the cache")
+    auth.add_argument("--iterations", type=int, default=100000)
+    auth.set_defaults(func=bench_auth)
+
+    admin_orders = subparsers.add_parser("admin-orders", help="GET /api/admin/orders paging over a large order history")
+    admin_orders.add_argument("--orders", type=int, default=100000)
+    admin_orders.add_argument("--iterations", type=int, default=50)
+    admin_orders.add_argument("--full", action="store_true", help="also time the unpaginated response")
+    admin_orders.set_defaults(func=bench_admin_orders)
+
+    category_admin = subparsers.add_parser("category-admin", help="category delete guard and rename cascade on a large catalog")
+    category_admin.add_argument("--catalog-size", type=int, default=100000)
+    category_admin.add_argument("--iterations", type=int, default=50)
+    category_admin.set_defaults(func=bench_category_admin)
+
+    admin_shell = subparsers.add_parser("admin-shell", help="requests/sec for the admin SPA shell by encoding and with revalidation")
+    admin_shell.add_argument("--clients", type=int, default=64)
+    admin_shell.add_argument("--duration", type=float, default=10.0)
+    admin_shell.set_defaults(func=bench_admin_shell)
+
+    static = subparsers.add_parser("static", help="admin/server.py legacy mode vs. threaded cache-aware mode")
+    static.add_argument("--ports", type=int, nargs=2, default=[8021, 8022])
+    static.add_argument("--clients", type=int, default=64)
+    static.add_argument("--duration", type=float, default=10.0)
+    static.set_defaults(func=bench_static)
+
+    encoding = subparsers.add_parser("encoding", help="JSON encode time and compressed bytes-on-wire for list endpoints")
+    encoding.add_argument("--orders", type=int, default=10000)
+    encoding.add_argument("--user-orders", type=int, default=200)
+    encoding.add_argument("--iterations", type=int, default=20)
+    encoding.set_defaults(func=bench_encoding)
+
+    export = subparsers.add_parser("export", help="peak worker RSS while streaming a large admin order export")
+    export.add_argument("--orders", type=int, default=1000000)
+    export.add_argument("--port", type=int, default=8013)
+    export.add_argument("--max-growth-mb", type=float, default=100.0)
+    export.set_defaults(func=bench_export)
+
+    bulk_import = subparsers.add_parser("bulk-import", help="POST /api/admin/products/bulk throughput vs. one POST per product")
+    bulk_import.add_argument("--rows", type=int, default=100000)
+    bulk_import.add_argument("--single-rows", type=int, default=1000)
+    bulk_import.set_defaults(func=bench_bulk_import)
+
+    startup = subparsers.add_parser("startup", help="worker cold-start time with and without seeding work")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--port", type=int, default=8014)
+    startup.set_defaults(func=bench_startup)
+
+    metrics_overhead = subparsers.add_parser("metrics-overhead", help="request throughput with metrics off vs. on")
+    metrics_overhead.add_argument("--ports", type=int, nargs=2, default=[8015, 8016])
+    metrics_overhead.add_argument("--clients", type=int, default=32)
+    metrics_overhead.add_argument("--duration", type=float, default=10.0)
+    metrics_overhead.add_argument("--iterations", type=int, default=100000)
+    metrics_overhead.set_defaults(func=bench_metrics_overhead)
+
+    load = subparsers.add_parser("load", help="concurrent virtual users replaying weighted backend_test.py journeys")
+    load.add_argument("--users", type=int, default=100)
+    load.add_argument("--duration", type=float, default=60.0)
+    load.add_argument("--warmup", type=float, default=10.0)
+    load.add_argument("--think-ms", type=float, default=0.0, help="mean pause between steps; 0 runs flat out")
+    load.add_argument("--weights", nargs="*", metavar="JOURNEY=WEIGHT", help=f"override the mix (default {JOURNEY_WEIGHTS})")
+    load.add_argument("--products", type=int, default=20, help="bench products used for carts and orders")
+    load.add_argument("--seed", type=int, default=1)
+    load.add_argument("--timeout", type=float, default=30.0)
+    load.add_argument("--spawn", action="store_true", help="start a worker on --port instead of using --base-url")
+    load.add_argument("--port", type=int, default=8017)
+    load.set_defaults(func=bench_load)
+
+    args = parser.parse_args()
+    BASE_URL = args.base_url.rstrip("/")
+    API_URL = f"{BASE_URL}/api"
+    results = args.func(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": args.benchmark, "results": results}, f, indent=2)
+        print_info(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
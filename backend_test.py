@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import requests
 import json
+from pymongo import MongoClient
 import time
 import os
 import sys
@@ -9,6 +10,8 @@ from datetime import datetime
 # Configuration
 BASE_URL = "http://localhost:8001"  # Using the backend URL from frontend/.env
 API_URL = f"{BASE_URL}/api"
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+DB_NAME = "joshi_brothers_db"
 
 # Test user data
 TEST_USER = {
@@ -256,6 +259,43 @@ def test_protected_route():
         print_error(f"Error testing protected route with token: {str(e)}")
         return False
 
+def test_logout_revokes_token():
+    print_test("Testing that POST /api/auth/logout revokes the token")
+    
+    try:
+        # A throwaway account, so the shared test token stays valid
+        response = requests.post(f"{API_URL}/auth/register", json={
+            "name": "Logout Test User",
+            "email": f"logout_{int(time.time() * 1000)}@example.com",
+            "password": "Test@123",
+        })
+        if response.status_code != 200:
+            print_error(f"Failed to register logout test user: {response.status_code} - {response.text}")
+            return False
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        
+        # The first request puts the token in the verified-token cache
+        response = requests.get(f"{API_URL}/cart", headers=headers)
+        if response.status_code != 200:
+            print_error(f"Token rejected before logout: {response.status_code}")
+            return False
+        
+        response = requests.post(f"{API_URL}/auth/logout", headers=headers)
+        if response.status_code != 200:
+            print_error(f"Logout failed: {response.status_code} - {response.text}")
+            return False
+        
+        response = requests.get(f"{API_URL}/cart", headers=headers)
+        if response.status_code != 401:
+            print_error(f"Expected 401 with a revoked token, got {response.status_code}")
+            return False
+        
+        print_success("Revoked token is rejected after logout")
+        return True
+    except Exception as e:
+        print_error(f"Error testing logout: {str(e)}")
+        return False
+
 def test_get_all_products():
     print_test("Testing GET /api/products (all products)")
     
@@ -276,6 +316,30 @@ def test_get_all_products():
         print_error(f"Error retrieving products: {str(e)}")
         return False
 
+def test_get_products_ndjson():
+    print_test("Testing GET /api/products as NDJSON")
+    
+    try:
+        expected = requests.get(f"{API_URL}/products").json()["products"]
+        response = requests.get(f"{API_URL}/products", headers={"Accept": "application/x-ndjson"})
+        if response.status_code != 200:
+            print_error(f"Failed to stream products: {response.status_code} - {response.text}")
+            return False
+        if not response.headers.get("content-type", "").startswith("application/x-ndjson"):
+            print_error(f"Unexpected content type: {response.headers.get('content-type')}")
+            return False
+        
+        products = [json.loads(line) for line in response.text.splitlines() if line]
+        if [product["id"] for product in products] != [product["id"] for product in expected]:
+            print_error(f"NDJSON returned {len(products)} products, JSON returned {len(expected)}")
+            return False
+        
+        print_success(f"Streamed {len(products)} products as NDJSON")
+        return True
+    except Exception as e:
+        print_error(f"Error streaming products: {str(e)}")
+        return False
+
 def test_get_products_by_category():
     print_test("Testing GET /api/products with category filter")
     
@@ -556,6 +620,52 @@ def test_remove_from_cart():
         print_error(f"Error removing item from cart: {str(e)}")
         return False
 
+def test_batch_cart():
+    print_test("Testing POST /api/cart/batch")
+    
+    global auth_token, product_id
+    if not auth_token or not product_id:
+        print_error("Missing auth_token or product_id for batch cart test")
+        return False
+    
+    try:
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        batch = {
+            "items": [
+                {"product_id": product_id, "quantity": 1},
+                {"product_id": product_id, "quantity": 2}
+            ]
+        }
+        
+        response = requests.post(f"{API_URL}/cart/batch", json=batch, headers=headers)
+        if response.status_code != 200:
+            print_error(f"Failed to batch add to cart: {response.status_code} - {response.text}")
+            return False
+        
+        response = requests.get(f"{API_URL}/cart", headers=headers)
+        quantities = {item["product_id"]: item["quantity"] for item in response.json().get("cart_items", [])}
+        if quantities.get(product_id) != 3:
+            print_error(f"Expected quantity 3 after batch add, found {quantities.get(product_id)}")
+            return False
+        print_success("Batch add merged quantities correctly")
+        
+        # Replacing with an empty list syncs the cart back to empty
+        response = requests.post(f"{API_URL}/cart/batch", json={"items": [], "replace": True}, headers=headers)
+        if response.status_code != 200:
+            print_error(f"Failed to replace cart: {response.status_code} - {response.text}")
+            return False
+        
+        response = requests.get(f"{API_URL}/cart", headers=headers)
+        if response.json().get("cart_items"):
+            print_error("Cart not empty after replace with no items")
+            return False
+        
+        print_success("Batch replace synced the cart")
+        return True
+    except Exception as e:
+        print_error(f"Error in batch cart test: {str(e)}")
+        return False
+
 def test_create_order():
     print_test("Testing POST /api/orders")
     
@@ -672,6 +782,256 @@ def test_get_orders():
         print_error(f"Error retrieving orders: {str(e)}")
         return False
 
+# (name, collection, filter, sort) for every lookup issued by the API handlers
+ENDPOINT_QUERIES = [
+    ("get_product", "products", {"id": "x"}, None),
+    ("get_products?category", "products", {"category": "Dairy"}, None),
+    ("get_products?brand", "products", {"brand": "Amul"}, None),
+    ("get_products?category&brand", "products", {"category": "Dairy", "brand": "Amul"}, None),
+    ("get_products?sort=price", "products", {}, [("price", 1), ("_id", 1)]),
+    ("get_products?sort=-name", "products", {}, [("name", -1), ("_id", -1)]),
+    ("get_products?category&sort=price", "products", {"category": "Dairy"}, [("price", 1), ("_id", 1)]),
+    ("bulk_import_products", "products", {"sku": {"$in": ["x", "y"]}}, None),
+    ("login", "users", {"email": "x@example.com"}, None),
+    ("admin_login", "users", {"email": "x@example.com", "role": "admin"}, None),
+    ("get_all_orders user_details", "users", {"id": "x"}, None),
+    ("get_cart", "cart", {"user_id": "x"}, None),
+    ("add_to_cart", "cart", {"user_id": "x", "product_id": "y"}, None),
+    ("get_orders", "orders", {"user_id": "x"}, None),
+    ("get_all_orders", "orders", {}, [("order_date", -1), ("_id", -1)]),
+    ("get_all_orders?status", "orders", {"status": "pending"}, [("order_date", -1), ("_id", -1)]),
+    ("get_all_orders?user_id", "orders", {"user_id": "x"}, [("order_date", -1), ("_id", -1)]),
+    ("update_order_status", "orders", {"id": "x"}, None),
+    ("create_category", "categories", {"name": "x"}, None),
+    ("update_category", "categories", {"id": "x"}, None),
+    ("create_brand", "brands", {"name": "x"}, None),
+    ("update_brand", "brands", {"id": "x"}, None),
+    ("verify_token revocation", "revoked_tokens", {"digest": "x"}, None),
+]
+
+def plan_stages(plan):
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+def test_query_plans():
+    print_test("Testing that endpoint queries are index-backed (no COLLSCAN)")
+    
+    try:
+        client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+        db = client[DB_NAME]
+        scans = []
+        for name, collection, query, sort in ENDPOINT_QUERIES:
+            cursor = db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            stages = plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+            if "COLLSCAN" in stages:
+                scans.append(name)
+                print_error(f"{name}: COLLSCAN on {collection} for {query}")
+        client.close()
+        
+        if scans:
+            return False
+        print_success(f"All {len(ENDPOINT_QUERIES)} endpoint queries use an index")
+        return True
+    except Exception as e:
+        print_error(f"Error explaining endpoint queries: {str(e)}")
+        return False
+
+def get_admin_token():
+    global admin_token
+    if not admin_token:
+        response = requests.post(f"{API_URL}/admin/login", json={"email": "admin@joshibrothers.com", "password": "Admin@123"})
+        response.raise_for_status()
+        admin_token = response.json()["token"]
+    return admin_token
+
+def bulk_upload(body, mode, content_type):
+    return requests.post(
+        f"{API_URL}/admin/products/bulk",
+        params={"mode": mode},
+        data=body.encode("utf-8"),
+        headers={"Authorization": f"Bearer {get_admin_token()}", "Content-Type": content_type},
+    )
+
+def check_bulk_report(response, created, updated, error_rows):
+    if response.status_code != 200:
+        print_error(f"Bulk import failed: {response.status_code} - {response.text}")
+        return False
+    report = response.json()
+    rows = [error["row"] for error in report["errors"]]
+    if (report["created"], report["updated"], rows) != (created, updated, error_rows):
+        print_error(f"Expected created={created} updated={updated} error rows {error_rows}, got {report}")
+        return False
+    return True
+
+def test_bulk_import_products():
+    print_test("Testing POST /api/admin/products/bulk")
+    
+    prefix = f"TEST-{int(time.time() * 1000)}"
+    try:
+        client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+        db = client[DB_NAME]
+        products_before = (db.stats.find_one({"_id": "dashboard"}) or {}).get("total_products", 0)
+        dairy_before = db.categories.find_one({"name": "Dairy"})["product_count"]
+        
+        # Rows 3 (bad price) and 4 (SKU repeated within the upload) are rejected
+        csv_body = "\n".join([
+            "sku,name,description,price,category,brand,image_url,stock,unit",
+            f"{prefix}-A,Bulk Paneer,Test product,120,Dairy,Amul,https://images.example.com/test.jpg,10,200g",
+            f"{prefix}-B,Bulk Butter,Test product,55,Dairy,Amul,https://images.example.com/test.jpg,20,100g",
+            f"{prefix}-C,Bulk Cheese,Test product,not-a-price,Dairy,Amul,https://images.example.com/test.jpg,5,200g",
+            f"{prefix}-A,Bulk Paneer Again,Test product,130,Dairy,Amul,https://images.example.com/test.jpg,10,200g",
+        ])
+        if not check_bulk_report(bulk_upload(csv_body, "create", "text/csv"), 2, 0, [3, 4]):
+            return False
+        
+        # Upsert creates D and updates A; row 3 has no SKU and row 4 is not JSON
+        base = {"description": "Test product", "category": "Dairy", "brand": "Amul", "image_url": "", "unit": "1kg"}
+        ndjson_body = "\n".join([
+            json.dumps({**base, "sku": f"{prefix}-D", "name": "Bulk Ghee", "price": 500, "stock": 8}),
+            json.dumps({**base, "sku": f"{prefix}-A", "name": "Bulk Paneer", "price": 125, "stock": 10}),
+            json.dumps({**base, "name": "Bulk Curd", "price": 40, "stock": 3}),
+            "{not json",
+        ])
+        if not check_bulk_report(bulk_upload(ndjson_body, "upsert", "application/x-ndjson"), 1, 1, [3, 4]):
+            return False
+        
+        # A create that repeats a stored SKU is reported per row
+        header, _, row_b = csv_body.split("\n")[:3]
+        if not check_bulk_report(bulk_upload(f"{header}\n{row_b}", "create", "text/csv"), 0, 0, [1]):
+            return False
+        
+        # A price/stock file touches only those fields
+        before = {product["sku"]: product for product in db.products.find({"sku": {"$regex": f"^{prefix}"}}, {"_id": 0})}
+        update_body = f"sku,price,stock\n{prefix}-A,99.5,77\n{prefix}-B,60,0\n{prefix}-Z,10,1\n"
+        if not check_bulk_report(bulk_upload(update_body, "update", "text/csv"), 0, 2, [3]):
+            return False
+        after = {product["sku"]: product for product in db.products.find({"sku": {"$regex": f"^{prefix}"}}, {"_id": 0})}
+        expected = {f"{prefix}-A": (99.5, 77), f"{prefix}-B": (60.0, 0)}
+        for sku, (price, stock) in expected.items():
+            changed = {field for field in after[sku] if after[sku][field] != before[sku].get(field)}
+            if (after[sku]["price"], after[sku]["stock"]) != (price, stock) or not changed <= {"price", "stock"}:
+                print_error(f"Update of {sku} changed {sorted(changed)}: {after[sku]}")
+                return False
+        
+        products_after = db.stats.find_one({"_id": "dashboard"})["total_products"]
+        dairy_after = db.categories.find_one({"name": "Dairy"})["product_count"]
+        if (products_after - products_before, dairy_after - dairy_before) != (3, 3):
+            print_error(f"Expected 3 more products in stats and in Dairy, got {products_after - products_before} and {dairy_after - dairy_before}")
+            return False
+        
+        # Clean up through the API so the counters are decremented again
+        headers = {"Authorization": f"Bearer {get_admin_token()}"}
+        for product in after.values():
+            requests.delete(f"{API_URL}/admin/products/{product['id']}", headers=headers)
+        client.close()
+        
+        print_success("Bulk import created, upserted and updated products with per-row errors")
+        return True
+    except Exception as e:
+        print_error(f"Error testing bulk import: {str(e)}")
+        return False
+
+def test_profile_request():
+    print_test("Testing on-demand profiling of GET /api/products")
+    
+    try:
+        # Customer tokens must not be able to profile
+        response = requests.get(f"{API_URL}/products", headers={"X-Profile-Token": auth_token})
+        if response.status_code != 403:
+            print_error(f"Expected 403 for a customer token, got {response.status_code}")
+            return False
+
+        # Tokens in the query string end up in access logs, so they are ignored
+        response = requests.get(f"{API_URL}/products", params={"_profile": get_admin_token()})
+        if response.status_code != 200 or "x-profiled-status" in response.headers:
+            print_error("A token in ?_profile= should not start a profile")
+            return False
+
+        # ?_profile=1 is only a flag; the token still comes from the headers
+        response = requests.get(f"{API_URL}/products", params={"_profile": "1"}, headers={"Authorization": f"Bearer {auth_token}"})
+        if response.status_code != 403:
+            print_error(f"Expected 403 for ?_profile=1 with a customer token, got {response.status_code}")
+            return False
+
+        response = requests.get(f"{API_URL}/products", headers={"X-Profile-Token": get_admin_token(), "X-Profile-Mode": "trace"})
+        if response.status_code != 200 or response.headers.get("x-profiled-status") != "200":
+            print_error(f"Failed to profile products: {response.status_code} - {response.text[:200]}")
+            return False
+        lines = response.text.splitlines()
+        if not lines or not all(line.rsplit(" ", 1)[1].isdigit() for line in lines):
+            print_error("Profile is not in collapsed-stack format")
+            return False
+        
+        print_success(f"Profiled request: {len(lines)} stacks, {response.headers.get('x-profile-total')}us")
+        return True
+    except Exception as e:
+        print_error(f"Error profiling request: {str(e)}")
+        return False
+
+def test_catalog_cache_versions():
+    print_test("Testing that a product invalidation does not discard a list page being loaded")
+    
+    try:
+        import asyncio
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+        from cache import LoadingCache
+        
+        async def scenario():
+            cache = LoadingCache()
+            started = asyncio.Event()
+            release = asyncio.Event()
+            
+            async def load_page():
+                started.set()
+                await release.wait()
+                return ["page"]
+            
+            async def load_again():
+                return ["reloaded"]
+            
+            # An order touching one product arrives while the list page loads
+            load = asyncio.ensure_future(cache.get_or_load(("products", None, 20), load_page))
+            await started.wait()
+            cache.invalidate("product", "some-product")
+            release.set()
+            await load
+            kept = await cache.get_or_load(("products", None, 20), load_again)
+            
+            # A write to the list namespace itself still wins over the load
+            started.clear()
+            release.clear()
+            load = asyncio.ensure_future(cache.get_or_load(("products", "Dairy", 20), load_page))
+            await started.wait()
+            cache.invalidate("products")
+            release.set()
+            await load
+            dropped = await cache.get_or_load(("products", "Dairy", 20), load_again)
+            return kept, dropped
+        
+        kept, dropped = asyncio.run(scenario())
+        if kept != ["page"]:
+            print_error("List page was not cached after an unrelated product invalidation")
+            return False
+        if dropped != ["reloaded"]:
+            print_error("List page loaded across a products invalidation was cached")
+            return False
+        
+        print_success("Invalidations only discard loads of the keys they affect")
+        return True
+    except Exception as e:
+        print_error(f"Error checking catalog cache versions: {str(e)}")
+        return False
+
 def run_tests():
     print_header("JOSHI BROTHERS HYPERPURE BACKEND API TESTS")
     print(f"Testing API at: {API_URL}")
@@ -691,27 +1051,43 @@ def run_tests():
     results["user_registration"] = test_user_registration()
     results["user_login"] = test_user_login()
     results["protected_route"] = test_protected_route()
+    results["logout_revokes_token"] = test_logout_revokes_token()
     
     # 3. Product Management
     print_header("3. Product Management Tests")
     results["get_all_products"] = test_get_all_products()
+    results["get_products_ndjson"] = test_get_products_ndjson()
     results["get_products_by_category"] = test_get_products_by_category()
     results["get_products_by_brand"] = test_get_products_by_brand()
     results["get_product_by_id"] = test_get_product_by_id()
     results["get_categories"] = test_get_categories()
     results["get_brands"] = test_get_brands()
+    results["catalog_cache_versions"] = test_catalog_cache_versions()
     
     # 4. Shopping Cart Functionality
     print_header("4. Shopping Cart Functionality Tests")
     results["add_to_cart"] = test_add_to_cart()
     results["get_cart"] = test_get_cart()
     results["remove_from_cart"] = test_remove_from_cart()
+    results["batch_cart"] = test_batch_cart()
     
     # 5. Order Management
     print_header("5. Order Management Tests")
     results["create_order"] = test_create_order()
     results["get_orders"] = test_get_orders()
     
+    # 6. Admin Bulk Import
+    print_header("6. Admin Bulk Import Tests")
+    results["bulk_import_products"] = test_bulk_import_products()
+    
+    # 7. Query Plans
+    print_header("7. Query Plan Tests")
+    results["query_plans"] = test_query_plans()
+    
+    # 8. Profiler
+    print_header("8. Profiler Tests")
+    results["profile_request"] = test_profile_request()
+    
     # Print summary
     print_header("TEST SUMMARY")
     